@@ -18,6 +18,10 @@ function launchGame() {
     });
 }
 
+function onGameLog(lines) {
+    lines.forEach(line => console.log('Game: ' + line));
+}
+
 function resetLaunchButton() {
     const btn = document.querySelector('.btn-launch');
     if (btn.dataset.originalText) {
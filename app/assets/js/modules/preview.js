@@ -1,110 +1,270 @@
 // Preview Module - Handles screenshots and texturepacks preview
 
-async function loadScreenshots() {
-    const container = document.getElementById('screenshots-grid');
-    const emptyState = document.getElementById('screenshots-empty');
-    const loadingState = document.getElementById('screenshots-loading');
+const GALLERY_PAGE_SIZE = 60;
 
-    if (!container) return;
+const galleryState = {
+    screenshots: { offset: 0, total: 0, loading: false, generation: 0, observer: null, cursor: null, refreshing: false, refreshPending: false },
+    texturepacks: { offset: 0, total: 0, loading: false, generation: 0, observer: null, cursor: null, refreshing: false, refreshPending: false }
+};
+
+function galleryElements(folderType) {
+    return {
+        container: document.getElementById(`${folderType}-grid`),
+        emptyState: document.getElementById(`${folderType}-empty`),
+        loadingState: document.getElementById(`${folderType}-loading`)
+    };
+}
+
+function resetGallery(folderType) {
+    const state = galleryState[folderType];
+    state.observer?.disconnect();
+    state.offset = 0;
+    state.total = 0;
+    state.loading = false;
+    state.cursor = null;
+    state.generation++;
 
+    const { container, emptyState, loadingState } = galleryElements(folderType);
     loadingState?.classList.remove('hidden');
     emptyState?.classList.add('hidden');
     container.innerHTML = '';
+}
+
+async function loadGalleryPage(folderType) {
+    const state = galleryState[folderType];
+    const { container, emptyState, loadingState } = galleryElements(folderType);
+    if (!container || state.loading) return;
 
+    const generation = state.generation;
+    state.loading = true;
     try {
-        const result = await pywebview.api.get_screenshots();
+        const result = folderType === 'screenshots'
+            ? await pywebview.api.get_screenshots(state.offset, GALLERY_PAGE_SIZE, 'newest')
+            : await pywebview.api.get_texturepacks(state.offset, GALLERY_PAGE_SIZE);
+        if (generation !== state.generation) return;
         loadingState?.classList.add('hidden');
+        if (result.status === 'success' && state.offset === 0) state.cursor = result.cursor;
 
-        if (result.status === 'success' && result.items.length > 0) {
-            result.items.forEach(item => {
-                const card = createPreviewCard(item, 'screenshots');
-                container.appendChild(card);
-            });
-        } else {
+        if (result.status !== 'success' || result.total === 0) {
             emptyState?.classList.remove('hidden');
+            return;
         }
+
+        state.total = result.total;
+        state.offset += result.items.length;
+        const cards = galleryCards(container);
+        result.items.forEach(item => {
+            if (!cards.has(item.filename)) container.appendChild(createGalleryCard(folderType, item));
+        });
+
+        if (state.offset < state.total && container.lastElementChild) {
+            observeLastCard(folderType, container.lastElementChild);
+        }
+        requestThumbnails(folderType, result.items.filter(item => !item.thumbnail).map(item => item.filename));
     } catch (error) {
-        console.error('Failed to load screenshots:', error);
+        console.error(`Failed to load ${folderType}:`, error);
         loadingState?.classList.add('hidden');
-        emptyState?.classList.remove('hidden');
+        if (!container.children.length) emptyState?.classList.remove('hidden');
+    } finally {
+        if (generation === state.generation) state.loading = false;
     }
 }
 
-async function loadTexturepacks() {
-    const container = document.getElementById('texturepacks-grid');
-    const emptyState = document.getElementById('texturepacks-empty');
-    const loadingState = document.getElementById('texturepacks-loading');
+function observeLastCard(folderType, card) {
+    const state = galleryState[folderType];
+    state.observer?.disconnect();
+    state.observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            state.observer.disconnect();
+            loadGalleryPage(folderType);
+        }
+    }, { rootMargin: '400px' });
+    state.observer.observe(card);
+}
 
-    if (!container) return;
+function createGalleryCard(folderType, item) {
+    return folderType === 'screenshots' ? createPreviewCard(item, 'screenshots') : createTexturepackCard(item);
+}
 
-    loadingState?.classList.remove('hidden');
-    emptyState?.classList.add('hidden');
-    container.innerHTML = '';
+function galleryCards(container) {
+    const cards = new Map();
+    for (const card of container.children) cards.set(card.dataset.filename, card);
+    return cards;
+}
 
-    try {
-        const result = await pywebview.api.get_texturepacks();
-        loadingState?.classList.add('hidden');
+function galleryComesBefore(folderType, item, card) {
+    if (folderType === 'screenshots') return item.modified > Number(card.dataset.modified);
+    return item.name.toLowerCase() < card.dataset.name.toLowerCase();
+}
 
-        if (result.status === 'success' && result.items.length > 0) {
-            result.items.forEach(item => {
-                const card = createTexturepackCard(item);
-                container.appendChild(card);
-            });
-        } else {
-            emptyState?.classList.remove('hidden');
+async function refreshGallery(folderType) {
+    const state = galleryState[folderType];
+    if (!state.cursor) return;
+    if (state.refreshing) {
+        state.refreshPending = true;
+        return;
+    }
+
+    const generation = state.generation;
+    state.refreshing = true;
+    try {
+        const result = await pywebview.api.get_folder_changes(folderType, state.cursor);
+        if (result.status !== 'success' || generation !== state.generation) return;
+        if (result.reset) {
+            folderType === 'screenshots' ? loadScreenshots() : loadTexturepacks();
+            return;
         }
+        applyFolderChanges(folderType, result);
     } catch (error) {
-        console.error('Failed to load texturepacks:', error);
-        loadingState?.classList.add('hidden');
-        emptyState?.classList.remove('hidden');
+        console.error(`Failed to refresh ${folderType}:`, error);
+    } finally {
+        state.refreshing = false;
+        if (state.refreshPending) {
+            state.refreshPending = false;
+            refreshGallery(folderType);
+        }
     }
 }
 
-function createPreviewCard(item, folderType) {
+function applyFolderChanges(folderType, changes) {
+    const state = galleryState[folderType];
+    const { container, emptyState } = galleryElements(folderType);
+    if (!container) return;
+
+    const allLoaded = state.offset >= state.total;
+    const cards = galleryCards(container);
+    state.cursor = changes.cursor;
+    state.total = changes.total;
+
+    changes.removed.forEach(filename => {
+        const card = cards.get(filename);
+        if (!card) return;
+        card.remove();
+        cards.delete(filename);
+        state.offset--;
+    });
+    changes.modified.forEach(item => {
+        const card = cards.get(item.filename);
+        if (card) card.replaceWith(createGalleryCard(folderType, item));
+    });
+    changes.added.forEach(item => {
+        if (cards.has(item.filename)) return;
+        const before = Array.from(container.children).find(card => galleryComesBefore(folderType, item, card));
+        // Items past the last loaded card arrive with the page they belong to
+        if (!before && !allLoaded) return;
+        container.insertBefore(createGalleryCard(folderType, item), before || null);
+        state.offset++;
+    });
+
+    emptyState?.classList.toggle('hidden', container.children.length > 0);
+    const rendered = galleryCards(container);
+    requestThumbnails(folderType, changes.added.concat(changes.modified)
+        .filter(item => !item.thumbnail && rendered.has(item.filename)).map(item => item.filename));
+}
+
+function onFolderChanged(folderType) {
+    if (galleryState[folderType]) refreshGallery(folderType);
+}
+
+async function requestThumbnails(folderType, filenames) {
+    if (!filenames.length) return;
+    try {
+        await pywebview.api.request_thumbnails(folderType, filenames);
+    } catch (error) {
+        console.error('Failed to request thumbnails:', error);
+    }
+}
+
+function onThumbnailsReady(folderType, thumbnails) {
+    applyThumbnails(folderType, thumbnails);
+}
+
+function applyThumbnails(folderType, thumbnails) {
+    const { container } = galleryElements(folderType);
+    if (!container) return;
+    for (const card of container.children) {
+        const url = thumbnails[card.dataset.filename];
+        if (url) setCardThumbnail(card, url);
+    }
+}
+
+function setCardThumbnail(card, url) {
+    const thumb = card.querySelector('.preview-thumbnail');
+    const current = thumb?.querySelector('img, .placeholder-icon');
+    if (!current) return;
+    const img = document.createElement('img');
+    img.src = url;
+    img.alt = card.dataset.filename;
+    img.loading = 'lazy';
+    current.replaceWith(img);
+}
+
+const THUMBNAIL_PLACEHOLDER = `
+    <div class="placeholder-icon">
+        <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
+        </svg>
+    </div>`;
+
+// File names and pack descriptions come from disk, so they are only ever assigned as text or attributes
+function buildGalleryCard(folderType, item, { className, thumbClass, label, title, size }) {
     const card = document.createElement('div');
-    card.className = 'preview-card group';
+    card.className = className;
+    card.dataset.filename = item.filename;
     card.innerHTML = `
-        <div class="preview-thumbnail">
-            <img src="${item.thumbnail}" alt="${item.filename}" loading="lazy">
-            <button class="delete-btn" onclick="deletePreviewItem('${folderType}', '${item.filename}')" title="Delete">
+        <div class="preview-thumbnail ${thumbClass}">
+            ${THUMBNAIL_PLACEHOLDER}
+            <button class="delete-btn" title="Delete">
                 <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                     <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
                 </svg>
             </button>
         </div>
         <div class="preview-info">
-            <span class="preview-name" title="${item.filename}">${item.filename}</span>
+            <span class="preview-name"></span>
         </div>
     `;
+    card.querySelector('.delete-btn').addEventListener('click', () => deletePreviewItem(folderType, item.filename));
+
+    const name = card.querySelector('.preview-name');
+    name.textContent = label;
+    name.title = title;
+    if (size !== undefined) {
+        const sizeLabel = document.createElement('span');
+        sizeLabel.className = 'preview-size';
+        sizeLabel.textContent = size;
+        name.after(sizeLabel);
+    }
+    if (item.thumbnail) setCardThumbnail(card, item.thumbnail);
     return card;
 }
 
-function createTexturepackCard(item) {
-    const card = document.createElement('div');
-    card.className = 'preview-card texturepack-card group';
+async function loadScreenshots() {
+    if (!galleryElements('screenshots').container) return;
+    resetGallery('screenshots');
+    await loadGalleryPage('screenshots');
+}
 
-    const thumbnailHtml = item.thumbnail
-        ? `<img src="${item.thumbnail}" alt="${item.name}" loading="lazy">`
-        : `<div class="placeholder-icon">
-               <svg class="w-8 h-8" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                   <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 16l4.586-4.586a2 2 0 012.828 0L16 16m-2-2l1.586-1.586a2 2 0 012.828 0L20 14m-6-6h.01M6 20h12a2 2 0 002-2V6a2 2 0 00-2-2H6a2 2 0 00-2 2v12a2 2 0 002 2z"></path>
-               </svg>
-           </div>`;
+async function loadTexturepacks() {
+    if (!galleryElements('texturepacks').container) return;
+    resetGallery('texturepacks');
+    await loadGalleryPage('texturepacks');
+}
 
-    card.innerHTML = `
-        <div class="preview-thumbnail texturepack-thumb">
-            ${thumbnailHtml}
-            <button class="delete-btn" onclick="deletePreviewItem('texturepacks', '${item.filename}')" title="Delete">
-                <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
-                </svg>
-            </button>
-        </div>
-        <div class="preview-info">
-            <span class="preview-name" title="${item.name}">${item.name}</span>
-            <span class="preview-size">${formatFileSize(item.size)}</span>
-        </div>
-    `;
+function createPreviewCard(item, folderType) {
+    const card = buildGalleryCard(folderType, item, {
+        className: 'preview-card group', thumbClass: '', label: item.filename, title: item.filename
+    });
+    card.dataset.modified = item.modified;
+    return card;
+}
+
+function createTexturepackCard(item) {
+    const card = buildGalleryCard('texturepacks', item, {
+        className: 'preview-card texturepack-card group', thumbClass: 'texturepack-thumb',
+        label: item.name, title: item.description || item.name, size: formatFileSize(item.size)
+    });
+    card.dataset.name = item.name;
     return card;
 }
 
@@ -114,11 +274,7 @@ async function deletePreviewItem(folderType, filename) {
     try {
         const result = await pywebview.api.delete_file(folderType, filename);
         if (result.status === 'success') {
-            if (folderType === 'screenshots') {
-                loadScreenshots();
-            } else {
-                loadTexturepacks();
-            }
+            refreshGallery(folderType);
         } else {
             alert('Failed to delete: ' + result.message);
         }
@@ -137,3 +293,5 @@ function formatFileSize(bytes) {
 window.loadScreenshots = loadScreenshots;
 window.loadTexturepacks = loadTexturepacks;
 window.deletePreviewItem = deletePreviewItem;
+window.onThumbnailsReady = onThumbnailsReady;
+window.onFolderChanged = onFolderChanged;
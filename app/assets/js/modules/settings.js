@@ -97,6 +97,7 @@ function loadPerformance() {
         document.getElementById('perf-noexplicitgc').checked = perf.noexplicitgc !== false;
         document.getElementById('perf-tiered').checked = perf.tiered !== false;
         document.getElementById('perf-stringdedup').checked = perf.stringdedup || false;
+        document.getElementById('perf-gclog').checked = perf.gclog || false;
     });
 }
 
@@ -161,7 +162,8 @@ function savePerformance() {
         inlining: document.getElementById('perf-inlining').checked,
         noexplicitgc: document.getElementById('perf-noexplicitgc').checked,
         tiered: document.getElementById('perf-tiered').checked,
-        stringdedup: document.getElementById('perf-stringdedup').checked
+        stringdedup: document.getElementById('perf-stringdedup').checked,
+        gclog: document.getElementById('perf-gclog').checked
     };
 
     pywebview.api.save_settings({ performance: perfSettings }).then(() => {
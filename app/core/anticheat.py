@@ -1,188 +1,334 @@
 import os
-import time
 import threading
+import subprocess
 import zipfile
 import io
 import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.core.watcher import create_watcher
+from app.core.zipinspect import ZipInspector, compile_keywords
 
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class SecurityViolation(Exception):
     pass
 
+
+class ScanCache:
+    def __init__(self, path, flush_interval=10.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+        self._timer = None
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, IOError, OSError):
+                return {}
+        return {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, value, defer=False):
+        with self._lock:
+            if self._entries.get(key) == value:
+                return
+            self._entries[key] = value
+            self._dirty = True
+            if defer and self.flush_interval and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def prune(self):
+        with self._lock:
+            stale = [key for key in self._entries if not os.path.exists(key)]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps(self._entries)
+                self._dirty = False
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except (IOError, OSError):
+                with self._lock:
+                    self._dirty = True
+                if os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+    def close(self):
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+        self.flush()
+
 class AntiCheat:
     BANNED_KEYWORDS = ["xray", "x-ray", "ore", "透视"]
+    BANNED_PATTERN = compile_keywords(BANNED_KEYWORDS)
     BANNED_MOD_IDS = ["wurst", "meteor-client", "aristois", "bleachhack", "liquidbounce", "baritone"]
     MONITORED_FOLDERS = ["texturepacks", "resourcepacks", "mods"]
+    SCAN_WORKERS = min(8, (os.cpu_count() or 2) * 2)
     
-    OPAQUE_BLOCK_COORDS = [
-        (0, 1), (0, 2), (2, 2), (2, 1), (2, 0), (3, 2)
-    ]
+    OPAQUE_BLOCK_TILES = {
+        (0, 1): "stone", (0, 2): "dirt", (0, 4): "planks", (0, 7): "bricks",
+        (1, 0): "cobblestone", (1, 1): "bedrock", (1, 2): "sand", (1, 3): "gravel", (1, 4): "log",
+        (2, 0): "gold_ore", (2, 1): "iron_ore", (2, 2): "coal_ore", (2, 4): "mossy_cobblestone", (2, 5): "obsidian",
+        (3, 2): "diamond_ore", (3, 3): "redstone_ore", (10, 0): "lapis_ore",
+    }
+    OPAQUE_BLOCK_COORDS = list(OPAQUE_BLOCK_TILES)
+    ATLAS_TILES = 16
+    XRAY_ALPHA_THRESHOLD = 20
+    XRAY_TRANSPARENT_RATIO = 0.5
 
     def __init__(self, game_dir):
         self.game_dir = game_dir
         self.stop_monitoring = False
+        self._watcher = None
         self.cache_file = os.path.join(game_dir, "anticheat_cache.json")
-        self.cache = self._load_cache()
-
-    def _load_cache(self):
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError, OSError):
-                return {}
-        return {}
-
-    def _save_cache(self):
-        try:
-            with open(self.cache_file, "w") as f:
-                json.dump(self.cache, f)
-        except (IOError, OSError):
-            pass
+        self.cache = ScanCache(self.cache_file)
 
     def _get_file_hash(self, path):
         try:
             stat = os.stat(path)
-            return f"{stat.st_size}-{stat.st_mtime}"
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
         except (IOError, OSError):
             return None
 
+    def _is_mod(self, file_path):
+        mods_dir = os.path.join(self.game_dir, "mods") + os.sep
+        return (os.path.dirname(file_path) + os.sep).startswith(mods_dir) and file_path.endswith((".jar", ".zip"))
+
+    def _check_path(self, file_path, defer_flush=False):
+        file_hash = self._get_file_hash(file_path)
+        if file_hash and self.cache.get(file_path) == file_hash:
+            return False
+
+        if self._is_mod(file_path):
+            self._check_mod_internal(file_path)
+        else:
+            self._check_file(file_path)
+
+        if file_hash:
+            self.cache.set(file_path, file_hash, defer=defer_flush)
+        return True
+
+    def scan_paths(self, paths, defer_flush=False):
+        if not paths:
+            return
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.SCAN_WORKERS, len(paths))) as pool:
+                futures = [pool.submit(self._check_path, path, defer_flush) for path in paths]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except SecurityViolation:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            if not defer_flush:
+                self.cache.flush()
+
+    def _list_files(self, folder, extensions=None):
+        path = os.path.join(self.game_dir, folder)
+        if not os.path.exists(path):
+            return []
+        return [os.path.join(root, file) for root, _, files in os.walk(path) for file in files
+                if extensions is None or file.endswith(extensions)]
+
     def scan_assets(self):
-        for folder in ["texturepacks", "resourcepacks"]:
-            path = os.path.join(self.game_dir, folder)
-            if not os.path.exists(path):
-                continue
-            for root, _, files in os.walk(path):
-                for file in files:
-                    self._check_file(os.path.join(root, file))
+        self.cache.prune()
+        self.scan_paths(self._list_files("texturepacks") + self._list_files("resourcepacks"))
 
     def scan_mods(self):
-        mods_dir = os.path.join(self.game_dir, "mods")
-        if not os.path.exists(mods_dir):
-            return
-        for root, _, files in os.walk(mods_dir):
-            for file in files:
-                if file.endswith((".jar", ".zip")):
-                    self._check_mod_internal(os.path.join(root, file))
+        self.cache.prune()
+        self.scan_paths(self._list_files("mods", (".jar", ".zip")))
 
     def _check_mod_internal(self, file_path):
         try:
-            with zipfile.ZipFile(file_path, 'r') as zf:
-                if "fabric.mod.json" in zf.namelist():
-                    with zf.open("fabric.mod.json") as f:
+            with ZipInspector(file_path) as zi:
+                if "fabric.mod.json" in zi:
+                    with zi.open("fabric.mod.json") as f:
                         mod_id = json.load(f).get("id", "").lower()
                         if any(banned in mod_id for banned in self.BANNED_MOD_IDS):
                             raise SecurityViolation(f"Banned mod: {mod_id}")
-                elif "mcmod.info" in zf.namelist():
-                    with zf.open("mcmod.info") as f:
-                        content = f.read().decode('utf-8', errors='ignore').lower()
-                        if any(banned in content for banned in self.BANNED_MOD_IDS):
-                            raise SecurityViolation(f"Banned mod in {os.path.basename(file_path)}")
+                elif "mcmod.info" in zi:
+                    content = zi.read("mcmod.info").decode('utf-8', errors='ignore').lower()
+                    if any(banned in content for banned in self.BANNED_MOD_IDS):
+                        raise SecurityViolation(f"Banned mod in {os.path.basename(file_path)}")
         except zipfile.BadZipFile:
             pass
         except SecurityViolation:
             raise
-        except (IOError, OSError, json.JSONDecodeError):
+        except (IOError, OSError, ValueError):
             pass
 
-    def _check_file(self, file_path):
-        file_hash = self._get_file_hash(file_path)
-        if file_hash and file_path in self.cache and self.cache[file_path] == file_hash:
-            return
+    def inspect_archive(self, inspector, filename):
+        name = inspector.find_keyword(self.BANNED_PATTERN)
+        if name:
+            raise SecurityViolation(f"Banned content: {name}")
+        if Image:
+            for name in inspector.find_suffix("terrain.png"):
+                try:
+                    img_file = inspector.open(name)
+                except (KeyError, ValueError, zlib.error, zipfile.BadZipFile, NotImplementedError) as e:
+                    raise SecurityViolation(f"Unreadable terrain texture: {filename} ({name}: {e})")
+                with img_file:
+                    self._analyze_terrain_png(img_file, filename)
 
+    def _check_file(self, file_path):
         filename = os.path.basename(file_path).lower()
         
-        if any(kw in filename for kw in self.BANNED_KEYWORDS):
+        if self.BANNED_PATTERN.search(filename):
             raise SecurityViolation(f"Banned resource: {filename}")
         
         if filename.endswith(".zip"):
             try:
-                with zipfile.ZipFile(file_path, 'r') as zf:
-                    for name in zf.namelist():
-                        if any(kw in name.lower() for kw in self.BANNED_KEYWORDS):
-                            raise SecurityViolation(f"Banned content: {name}")
-                        if name.endswith("terrain.png") and Image:
-                            with zf.open(name) as img_file:
-                                self._analyze_terrain_png(img_file.read(), filename)
+                with ZipInspector(file_path) as zi:
+                    self.inspect_archive(zi, filename)
             except zipfile.BadZipFile:
                 pass
             except SecurityViolation:
                 raise
-            except (IOError, OSError):
+            except (IOError, OSError, ValueError):
                 pass
+
+    def _tile_alpha_stats(self, alpha, tile_size):
+        rows = min(self.ATLAS_TILES, alpha.shape[0] // tile_size)
+        grid = alpha[:rows * tile_size, :self.ATLAS_TILES * tile_size]
+        grid = grid.reshape(rows, tile_size, self.ATLAS_TILES, tile_size).swapaxes(1, 2)
+        tiles = [tile for tile in self.OPAQUE_BLOCK_TILES if tile[0] < rows]
+        if not tiles:
+            return {}
+        selected = grid[[row for row, _ in tiles], [col for _, col in tiles]]
+        transparent = (selected < self.XRAY_ALPHA_THRESHOLD).mean(axis=(1, 2))
+        mean_alpha = selected.mean(axis=(1, 2))
+        return {tile: (float(transparent[i]), float(mean_alpha[i])) for i, tile in enumerate(tiles)}
+
+    def _tile_alpha_stats_pil(self, alpha, tile_size):
+        stats = {}
+        for row, col in self.OPAQUE_BLOCK_TILES:
+            box = (col * tile_size, row * tile_size, (col + 1) * tile_size, (row + 1) * tile_size)
+            if box[3] > alpha.height:
+                continue
+            histogram = alpha.crop(box).histogram()
+            pixels = tile_size * tile_size
+            stats[(row, col)] = (sum(histogram[:self.XRAY_ALPHA_THRESHOLD]) / pixels,
+                                 sum(value * count for value, count in enumerate(histogram)) / pixels)
+        return stats
+
+    def analyze_terrain(self, img_data):
+        img = Image.open(io.BytesIO(img_data) if isinstance(img_data, bytes) else img_data)
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        tile_size = img.width // self.ATLAS_TILES
+        if tile_size == 0:
+            return {}
         
-        if file_hash:
-            self.cache[file_path] = file_hash
-            self._save_cache()
+        alpha = img.getchannel("A")
+        if np is not None:
+            stats = self._tile_alpha_stats(np.asarray(alpha), tile_size)
+        else:
+            stats = self._tile_alpha_stats_pil(alpha, tile_size)
+        
+        return {self.OPAQUE_BLOCK_TILES[tile]: {
+                    "tile": list(tile),
+                    "transparent_ratio": round(transparent, 4),
+                    "mean_alpha": round(mean_alpha, 2),
+                    "suspicious": transparent >= self.XRAY_TRANSPARENT_RATIO}
+                for tile, (transparent, mean_alpha) in stats.items()}
 
     def _analyze_terrain_png(self, img_data, filename):
         try:
-            img = Image.open(io.BytesIO(img_data)).convert("RGBA")
-            width, height = img.size
-            tile_size = width // 16
-            
-            for row, col in self.OPAQUE_BLOCK_COORDS:
-                origin_x, origin_y = col * tile_size, row * tile_size
-                
-                points = [
-                    (origin_x + tile_size//2, origin_y + tile_size//2),
-                    (origin_x + 2, origin_y + 2),
-                    (origin_x + tile_size - 3, origin_y + 2),
-                    (origin_x + 2, origin_y + tile_size - 3),
-                    (origin_x + tile_size - 3, origin_y + tile_size - 3)
-                ]
-                
-                transparent_count = sum(
-                    1 for px, py in points 
-                    if px < width and py < height and img.getpixel((px, py))[3] < 20
-                )
-                
-                if transparent_count == 5:
-                    raise SecurityViolation(f"X-ray detected: {filename}")
-        except SecurityViolation:
-            raise
-        except (IOError, OSError, ValueError):
+            report = self.analyze_terrain(img_data)
+        except (IOError, OSError, ValueError, zlib.error, Image.DecompressionBombError) as e:
+            raise SecurityViolation(f"Unreadable terrain texture: {filename} ({e})")
+        flagged = [name for name, tile in report.items() if tile["suspicious"]]
+        if flagged:
+            raise SecurityViolation(f"X-ray detected: {filename} ({', '.join(flagged)})")
+
+    def stop(self):
+        self.stop_monitoring = True
+        if self._watcher:
+            self._watcher.stop()
+
+    def _on_folder_change(self, process, on_violation, paths):
+        mods_dir = os.path.join(self.game_dir, "mods")
+        changed = [path for path in paths if os.path.exists(path) and
+                   (os.path.dirname(path) != mods_dir or path.endswith((".jar", ".zip")))]
+        try:
+            self.scan_paths(changed, defer_flush=True)
+        except SecurityViolation as e:
+            process.kill()
+            self.stop()
+            if on_violation:
+                on_violation(str(e))
+        except (IOError, OSError):
             pass
 
-    def monitor(self, process, on_violation):
-        def _watch():
-            snapshots = {}
-            for folder in self.MONITORED_FOLDERS:
-                path = os.path.join(self.game_dir, folder)
-                snapshots[folder] = set(os.listdir(path)) if os.path.exists(path) else set()
-            
-            while process.poll() is None and not self.stop_monitoring:
-                for folder in self.MONITORED_FOLDERS:
-                    path = os.path.join(self.game_dir, folder)
-                    current_files = set()
-                    
-                    if os.path.exists(path):
-                        with os.scandir(path) as entries:
-                            current_files = {e.name for e in entries}
-                    
-                    added = current_files - snapshots[folder]
-                    
-                    for file in added:
-                        file_path = os.path.join(path, file)
-                        try:
-                            if folder == "mods" and file.endswith((".jar", ".zip")):
-                                self._check_mod_internal(file_path)
-                            else:
-                                self._check_file(file_path)
-                        except SecurityViolation as e:
-                            process.kill()
-                            if on_violation:
-                                on_violation(str(e))
-                            return
-                        except (IOError, OSError):
-                            pass
-                    
-                    snapshots[folder] = current_files
-                
-                time.sleep(5)
-
-        threading.Thread(target=_watch, daemon=True).start()
+    def monitor(self, process, on_violation, backend=None):
+        folders = []
+        for folder in self.MONITORED_FOLDERS:
+            path = os.path.join(self.game_dir, folder)
+            try:
+                os.makedirs(path, exist_ok=True)
+                folders.append(path)
+            except (IOError, OSError):
+                pass
+        
+        self._watcher = create_watcher(folders, lambda paths: self._on_folder_change(process, on_violation, paths),
+                                       backend=backend)
+        self._watcher.start()
+        
+        def _wait():
+            while not self.stop_monitoring:
+                try:
+                    process.wait(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    continue
+            self._watcher.stop()
+            self.cache.close()
+
+        threading.Thread(target=_wait, daemon=True).start()
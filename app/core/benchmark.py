@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import threading
+import subprocess
+import logging
+
+from app.core.gclog import analyze_file
+from app.core.jvmflags import filter_jvm_args
+from app.core.outputreader import OutputReader
+from app.core.telemetry import ProcessSampler
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+PRESETS = {
+    "Balanced": {"microstutter": False, "g1gc": True, "pretouch": True, "parallel": True, "nobiasedlock": True,
+                 "codecache": True, "inlining": True, "noexplicitgc": True, "tiered": True, "stringdedup": False},
+    "Low Latency": {"microstutter": False, "g1gc": True, "pretouch": True, "parallel": True, "nobiasedlock": True,
+                    "codecache": True, "inlining": False, "noexplicitgc": True, "tiered": True, "stringdedup": False},
+    "Low Memory": {"microstutter": False, "g1gc": True, "pretouch": False, "parallel": True, "nobiasedlock": True,
+                   "codecache": False, "inlining": False, "noexplicitgc": True, "tiered": True, "stringdedup": True},
+    "Legacy CMS": {"microstutter": True, "g1gc": False, "pretouch": True, "parallel": True, "nobiasedlock": True,
+                   "codecache": True, "inlining": True, "noexplicitgc": True, "tiered": True, "stringdedup": False},
+}
+
+STAND_IN_SOURCE = """import java.util.*;
+
+public class StandIn {
+    public static void main(String[] args) {
+        long seconds = args.length > 0 ? Long.parseLong(args[0]) : 60;
+        long until = System.nanoTime() + seconds * 1_000_000_000L;
+        Random random = new Random(42);
+        List<byte[]> live = new ArrayList<>();
+        Map<Integer, int[]> meshes = new HashMap<>();
+        System.out.println("[StandIn/INFO]: ready");
+        long frames = 0;
+        while (System.nanoTime() < until) {
+            byte[] chunk = new byte[1024 + random.nextInt(64 * 1024)];
+            if (live.size() < 2000) live.add(chunk); else live.set(random.nextInt(live.size()), chunk);
+            meshes.put(random.nextInt(4096), new int[256 + random.nextInt(4096)]);
+            if (++frames % 100000 == 0) System.out.println("[StandIn/INFO]: frame " + frames);
+        }
+    }
+}
+"""
+
+
+class BenchmarkRunner:
+    WEIGHTS = {"startup_s": 0.2, "pause_p99_ms": 0.35, "pause_ratio": 0.25, "peak_rss_mb": 0.2}
+    STAND_IN_MIN_JAVA = 11
+
+    def __init__(self, service, duration=60, presets=None, stand_in=False, on_progress=None):
+        self.service = service
+        self.duration = max(int(duration), 10)
+        self.presets = [name for name in (presets or PRESETS) if name in PRESETS]
+        self.stand_in = stand_in
+        self.on_progress = on_progress
+        self.reports_dir = os.path.join(service.data_dir, "benchmarks")
+        self.running = False
+
+    def _progress(self, message, index):
+        logger.info("Benchmark: %s", message)
+        if self.on_progress:
+            self.on_progress(message, index, len(self.presets))
+
+    def _command(self, config, preset, gc_log_path, run_dir):
+        preset_config = dict(config)
+        preset_config["performance"] = dict(PRESETS[preset], gclog=True)
+        full_cmd, steps = self.service.prepare_launch(preset_config, gc_log_path=gc_log_path)
+        if not self.stand_in:
+            return full_cmd, self.service.resolver.game_dir
+
+        java_major = (steps["java_probe"] or {}).get("version") or self.service.java_mgr.get_java_version(steps["java"])
+        if not java_major or java_major < self.STAND_IN_MIN_JAVA:
+            raise RuntimeError(f"The stand-in benchmark needs Java {self.STAND_IN_MIN_JAVA}+")
+        source = os.path.join(run_dir, "StandIn.java")
+        if not os.path.exists(source):
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(STAND_IN_SOURCE)
+        jvm_args = filter_jvm_args(steps["jvm_args"] + steps["gc_log"], steps["java_probe"])
+        return [steps["java"]] + jvm_args + [source, str(self.duration)], run_dir
+
+    def _run_preset(self, config, preset, run_dir):
+        slug = preset.lower().replace(" ", "-")
+        gc_log_path = os.path.join(run_dir, f"{slug}.gc.log")
+        cmd, cwd = self._command(config, preset, gc_log_path, run_dir)
+
+        creation_flags = 0x08000000 if os.name == "nt" else 0
+        spawn_at = time.monotonic()
+        process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   bufsize=0, creationflags=creation_flags)
+        first_output = {}
+        reader = OutputReader(process.stdout)
+        reader_thread = threading.Thread(target=reader.run,
+                                         args=(lambda: first_output.setdefault("at", time.monotonic()),), daemon=True)
+        reader_thread.start()
+        sampler = ProcessSampler(process.pid, interval=1.0).start()
+
+        timed_out = False
+        try:
+            process.wait(timeout=self.duration)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        sampler.stop()
+        reader_thread.join(5)
+        process.stdout.close()
+
+        gc_summary = None
+        if os.path.exists(gc_log_path):
+            try:
+                gc_summary = analyze_file(gc_log_path)
+            except (IOError, OSError) as e:
+                logger.debug("Could not analyze benchmark GC log: %s", e)
+
+        startup = first_output.get("at")
+        return {
+            "preset": preset,
+            "performance": PRESETS[preset],
+            "exit_code": process.returncode,
+            "failed": not timed_out and process.returncode != 0,
+            "startup_s": round(startup - spawn_at, 3) if startup else None,
+            "gc": gc_summary,
+            "process": sampler.summary(),
+        }
+
+    def _metric(self, result, name):
+        gc = result.get("gc") or {}
+        if name == "startup_s":
+            return result.get("startup_s")
+        if name == "pause_p99_ms":
+            return gc.get("pause_ms", {}).get("p99")
+        if name == "pause_ratio":
+            return gc.get("pause_ratio")
+        return result["process"].get(name) or None
+
+    def _rank(self, results):
+        candidates = [r for r in results if not r["failed"]]
+        for result in candidates:
+            score = weight = 0.0
+            for name, metric_weight in self.WEIGHTS.items():
+                values = [v for v in (self._metric(r, name) for r in candidates) if v is not None]
+                value = self._metric(result, name)
+                if value is None or not values:
+                    continue
+                score += metric_weight * (value + 1e-3) / (min(values) + 1e-3)
+                weight += metric_weight
+            result["score"] = round(score / weight, 3) if weight else None
+        ranked = sorted((r for r in candidates if r.get("score") is not None), key=lambda r: r["score"])
+        return ranked[0]["preset"] if ranked else None
+
+    def run(self, config):
+        self.running = True
+        try:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            run_dir = os.path.join(self.reports_dir, f"benchmark-{stamp}")
+            os.makedirs(run_dir, exist_ok=True)
+
+            results = []
+            for index, preset in enumerate(self.presets):
+                self._progress(f"Running {preset}", index)
+                try:
+                    results.append(self._run_preset(config, preset, run_dir))
+                except (OSError, RuntimeError) as e:
+                    logger.error("Benchmark preset %s failed: %s", preset, e)
+                    results.append({"preset": preset, "failed": True, "error": str(e)})
+
+            report = {
+                "created_at": time.time(),
+                "duration_s": self.duration,
+                "stand_in": self.stand_in,
+                "max_ram": config.get("max_ram", 2048),
+                "host": {"cpus": os.cpu_count(),
+                         "total_ram_mb": psutil.virtual_memory().total // (1024 * 1024) if psutil else None},
+                "best": self._rank(results),
+                "results": results,
+            }
+            path = os.path.join(self.reports_dir, f"benchmark-{stamp}.json")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_path, path)
+            self._progress(f"Best preset: {report['best']}", len(self.presets))
+            return report
+        finally:
+            self.running = False
+
+
+def latest_report(reports_dir):
+    try:
+        names = sorted(name for name in os.listdir(reports_dir) if name.endswith(".json"))
+    except OSError:
+        return None
+    if not names:
+        return None
+    try:
+        with open(os.path.join(reports_dir, names[-1]), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        logger.debug("Could not read benchmark report: %s", e)
+        return None
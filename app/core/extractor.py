@@ -0,0 +1,187 @@
+import os
+import json
+import queue
+import hashlib
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _HashingReader:
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self.hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._fileobj.read(size)
+        self.hash.update(data)
+        return data
+
+    def drain(self):
+        for _ in iter(lambda: self.read(1024 * 1024), b""):
+            pass
+        return self.hash.hexdigest()
+
+
+def load_bundle_index(bundle_dir):
+    with open(os.path.join(bundle_dir, AssetExtractor.BUNDLE_INDEX), 'r') as f:
+        return json.load(f)
+
+
+class AssetExtractor:
+    BUNDLE_INDEX = "index.json"
+    PROGRESS_INTERVAL = 0.2
+    _DONE = object()
+
+    def __init__(self, parent_dir, previous_files=None, writers=None, fsync=True, on_progress=None):
+        self.parent_dir = parent_dir
+        self.base_path = os.path.abspath(parent_dir)
+        self.previous_files = previous_files or {}
+        self.writers = writers or min(8, (os.cpu_count() or 2) * 2)
+        self.fsync = fsync
+        self.on_progress = on_progress
+
+        self._queue = queue.Queue(maxsize=self.writers * 4)
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._errors = []
+        self._files = {}
+        self._written = 0
+        self._bytes_done = 0
+        self._files_done = 0
+        self._last_report = 0.0
+        self._totals = (None, None)
+
+    @staticmethod
+    def get_sources(archive_path):
+        if os.path.isdir(archive_path):
+            index = load_bundle_index(archive_path)
+            sources = [os.path.join(archive_path, part["file"]) for part in index.get("parts", [])]
+            return sources, (index.get("bytes"), index.get("files"))
+        return [archive_path], (None, None)
+
+    def run(self, sources, totals=(None, None)):
+        self._totals = totals
+        hashes = [None] * len(sources)
+
+        writer_threads = [threading.Thread(target=self._writer, daemon=True) for _ in range(self.writers)]
+        for thread in writer_threads:
+            thread.start()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(sources), os.cpu_count() or 1))) as pool:
+            for i, path in enumerate(sources):
+                pool.submit(self._decompress, i, path, hashes)
+
+        for _ in writer_threads:
+            self._queue.put(self._DONE)
+        for thread in writer_threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        self._report(force=True)
+        return self._files, self._written, hashes
+
+    def _fail(self, error):
+        with self._lock:
+            self._errors.append(error)
+        self._failed.set()
+
+    def _is_unchanged(self, previous, size, digest, target_path):
+        if not previous or previous.get("size") != size or previous.get("digest") != digest:
+            return False
+        try:
+            return os.path.getsize(target_path) == size
+        except OSError:
+            return False
+
+    def _decompress(self, index, path, hashes):
+        try:
+            with open(path, "rb") as raw:
+                reader = _HashingReader(raw)
+                with tarfile.open(fileobj=reader, mode="r|xz") as tar:
+                    for member in tar:
+                        if self._failed.is_set():
+                            return
+                        self._process_member(tar, member)
+                hashes[index] = reader.drain()
+        except Exception as e:
+            self._fail(e)
+
+    def _process_member(self, tar, member):
+        member_path = os.path.abspath(os.path.join(self.parent_dir, member.name))
+        if not member_path.startswith(self.base_path + os.sep):
+            raise Exception(f"Path traversal: {member.name}")
+
+        if member.isdir():
+            os.makedirs(member_path, exist_ok=True)
+            return
+        if not member.isfile():
+            tar.extract(member, self.parent_dir)
+            return
+
+        with tar.extractfile(member) as src:
+            data = src.read()
+        rel_path = os.path.relpath(member_path, self.base_path).replace(os.sep, "/")
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            self._files[rel_path] = {"size": member.size, "digest": digest}
+
+        if self._is_unchanged(self.previous_files.get(rel_path), member.size, digest, member_path):
+            self._advance(member.size)
+        else:
+            self._queue.put((member_path, data, member.mode))
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if self._failed.is_set():
+                continue
+            target_path, data, mode = item
+            try:
+                self._write(target_path, data, mode)
+                with self._lock:
+                    self._written += 1
+                self._advance(len(data))
+            except Exception as e:
+                self._fail(e)
+
+    def _write(self, target_path, data, mode):
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = f"{target_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if mode and os.name != 'nt':
+            os.chmod(tmp_path, mode & 0o777)
+        os.replace(tmp_path, target_path)
+
+    def _advance(self, size):
+        with self._lock:
+            self._bytes_done += size
+            self._files_done += 1
+        self._report()
+
+    def _report(self, force=False):
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+            bytes_done, files_done = self._bytes_done, self._files_done
+        bytes_total, files_total = self._totals
+        try:
+            self.on_progress(bytes_done, bytes_total, files_done, files_total)
+        except Exception as e:
+            logger.debug("Progress callback failed: %s", e)
@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+SIZE = r"(\d+(?:\.\d+)?)([KMG])"
+UNIFIED_PAUSE = re.compile(r"\[(\d+(?:\.\d+)?)s\].*?GC\(\d+\) (Pause .*?) " + SIZE + "->" + SIZE +
+                           r"\(" + SIZE + r"\) (\d+(?:\.\d+)?)ms")
+LEGACY_PAUSE = re.compile(r"(\d+(?:\.\d+)?): \[(Full GC|GC)(.*?) " + SIZE + "->" + SIZE +
+                          r"\(" + SIZE + r"\), (\d+(?:\.\d+)?) secs\]")
+UNITS_MB = {"K": 1 / 1024, "M": 1, "G": 1024}
+
+
+def gc_log_args(path, java_major):
+    if not java_major:
+        return []
+    if java_major >= 9:
+        return [f'-Xlog:gc*:file="{path}":uptime,level,tags:filecount=0']
+    return [f"-Xloggc:{path}", "-XX:+PrintGCTimeStamps"]
+
+
+def _mb(value, unit):
+    return float(value) * UNITS_MB[unit]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+class GCLogAnalyzer:
+    def __init__(self):
+        self.pauses = []
+        self.full_gcs = 0
+        self.heap_after = []
+        self.heap_capacity_mb = 0.0
+        self.allocated_mb = 0.0
+        self.first_at = None
+        self.last_at = None
+        self._last_after = None
+
+    def feed(self, line):
+        match = UNIFIED_PAUSE.search(line)
+        if match:
+            uptime, name = float(match.group(1)), match.group(2)
+            before, after, capacity = (_mb(*match.group(3, 4)), _mb(*match.group(5, 6)), _mb(*match.group(7, 8)))
+            pause_ms = float(match.group(9))
+            full = name.startswith("Pause Full")
+        else:
+            match = LEGACY_PAUSE.search(line)
+            if not match:
+                return
+            uptime = float(match.group(1))
+            before, after, capacity = (_mb(*match.group(4, 5)), _mb(*match.group(6, 7)), _mb(*match.group(8, 9)))
+            pause_ms = float(match.group(10)) * 1000
+            full = match.group(2) == "Full GC"
+        self._record(uptime, before, after, capacity, pause_ms, full)
+
+    def _record(self, uptime, before, after, capacity, pause_ms, full):
+        if self.first_at is None:
+            self.first_at = uptime
+        self.last_at = uptime
+        if self._last_after is not None and before > self._last_after:
+            self.allocated_mb += before - self._last_after
+        self._last_after = after
+        self.pauses.append(pause_ms)
+        self.heap_after.append(after)
+        self.heap_capacity_mb = capacity
+        if full:
+            self.full_gcs += 1
+
+    def feed_file(self, path):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                self.feed(line)
+        return self
+
+    def summary(self):
+        pauses = sorted(self.pauses)
+        heap_after = sorted(self.heap_after)
+        span = (self.last_at - self.first_at) if self.pauses else 0.0
+        return {
+            "collections": len(pauses),
+            "full_gcs": self.full_gcs,
+            "pause_ms": {"p50": round(_percentile(pauses, 50), 2), "p90": round(_percentile(pauses, 90), 2),
+                         "p99": round(_percentile(pauses, 99), 2), "max": round(pauses[-1], 2) if pauses else 0.0,
+                         "total": round(sum(pauses), 1)},
+            "pause_ratio": round(sum(pauses) / 1000 / span, 4) if span > 0 else 0.0,
+            "allocation_mb_s": round(self.allocated_mb / span, 1) if span > 0 else 0.0,
+            "heap_after_gc_mb": {"avg": round(sum(heap_after) / len(heap_after), 1) if heap_after else 0.0,
+                                 "p90": round(_percentile(heap_after, 90), 1),
+                                 "max": round(heap_after[-1], 1) if heap_after else 0.0},
+            "heap_capacity_mb": round(self.heap_capacity_mb, 1),
+            "uptime_s": round(self.last_at or 0.0, 1),
+        }
+
+
+def analyze_file(path):
+    return GCLogAnalyzer().feed_file(path).summary()
+
+
+def summarize_sessions(logs_dir, session=None, limit=10):
+    try:
+        names = sorted((name for name in os.listdir(logs_dir) if name.endswith(".gc.log")), reverse=True)
+    except OSError:
+        return []
+    results = []
+    for name in names:
+        name_session = name[:-len(".gc.log")]
+        if session and name_session != session:
+            continue
+        try:
+            entry = {"session": name_session, "gc": analyze_file(os.path.join(logs_dir, name))}
+        except (IOError, OSError) as e:
+            logger.debug("Could not analyze GC log %s: %s", name, e)
+            continue
+        try:
+            with open(os.path.join(logs_dir, f"{name_session}.metrics.json"), "r", encoding="utf-8") as f:
+                metrics = json.load(f)
+            entry["performance"] = metrics.get("performance")
+            entry["max_ram"] = metrics.get("max_ram")
+        except (IOError, OSError, ValueError):
+            pass
+        results.append(entry)
+        if len(results) >= limit:
+            break
+    return results
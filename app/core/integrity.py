@@ -1,7 +1,9 @@
 import os
 import zipfile
-import shutil
+import hashlib
+import json
 import sys
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,26 +18,130 @@ class InstanceDoctor:
             self.natives_dir = os.path.join(base, "app", "game", "natives")
         else:
             self.natives_dir = os.path.join(root_dir, "app", "game", "natives")
+        self.state_file = os.path.join(os.path.dirname(self.natives_dir), ".natives_state.json")
 
     def heal(self, natives_list):
         self._extract_natives(natives_list)
 
-    def _extract_natives(self, natives_list):
-        if os.path.exists(self.natives_dir):
+    def _load_state(self):
+        if os.path.exists(self.state_file):
             try:
-                shutil.rmtree(self.natives_dir)
-            except (IOError, OSError, PermissionError) as e:
-                logger.debug("Could not clean natives dir: %s", e)
-        
+                with open(self.state_file, "r") as f:
+                    return json.load(f).get("jars", {})
+            except (json.JSONDecodeError, IOError, OSError, AttributeError):
+                pass
+        return {}
+
+    def _save_state(self, jars):
+        try:
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"jars": jars}, f)
+            os.replace(tmp_path, self.state_file)
+        except (IOError, OSError) as e:
+            logger.debug("Could not save natives state: %s", e)
+
+    def _jar_signature(self, path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _file_digest(self, path):
+        file_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    def _files_intact(self, files):
+        for name, info in files.items():
+            try:
+                if os.path.getsize(os.path.join(self.natives_dir, name)) != info.get("size"):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _target_path(self, name):
+        target = os.path.normpath(os.path.join(self.natives_dir, name))
+        if not target.startswith(os.path.normpath(self.natives_dir) + os.sep):
+            raise ValueError(f"Path traversal: {name}")
+        return target
+
+    def _write_atomic(self, target, data):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _extract_jar(self, native_jar):
+        files = {}
+        complete = True
+        with zipfile.ZipFile(native_jar, 'r') as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not info.filename.endswith(self.NATIVE_EXTENSIONS):
+                    continue
+                target = self._target_path(info.filename)
+                data = zf.read(info)
+                digest = hashlib.sha256(data).hexdigest()
+                files[info.filename] = {"size": len(data), "digest": digest}
+
+                if os.path.exists(target) and os.path.getsize(target) == len(data) and self._file_digest(target) == digest:
+                    continue
+                try:
+                    self._write_atomic(target, data)
+                except (IOError, OSError, PermissionError) as e:
+                    logger.debug("Could not replace native %s (in use?): %s", info.filename, e)
+                    complete = False
+        return files, complete
+
+    def _remove_orphans(self, previous_jars, current_jars):
+        kept = {name for entry in current_jars.values() for name in entry.get("files", {})}
+        for entry in previous_jars.values():
+            for name in entry.get("files", {}):
+                if name in kept:
+                    continue
+                try:
+                    path = self._target_path(name)
+                    if os.path.isfile(path):
+                        os.remove(path)
+                except (ValueError, IOError, OSError, PermissionError) as e:
+                    logger.debug("Could not remove stale native %s: %s", name, e)
+
+    def _extract_natives(self, natives_list):
         os.makedirs(self.natives_dir, exist_ok=True)
-        
+        previous_jars = self._load_state()
+        current_jars = {}
+
         for native_jar in natives_list:
             if not os.path.exists(native_jar):
                 continue
             try:
-                with zipfile.ZipFile(native_jar, 'r') as zf:
-                    for file in zf.namelist():
-                        if file.endswith(self.NATIVE_EXTENSIONS):
-                            zf.extract(file, self.natives_dir)
-            except (zipfile.BadZipFile, IOError, OSError) as e:
+                signature = self._jar_signature(native_jar)
+                previous = previous_jars.get(native_jar)
+                if previous and previous.get("signature") == signature and self._files_intact(previous.get("files", {})):
+                    current_jars[native_jar] = previous
+                    continue
+
+                digest = self._file_digest(native_jar)
+                if previous and previous.get("digest") == digest and self._files_intact(previous.get("files", {})):
+                    current_jars[native_jar] = dict(previous, signature=signature)
+                    continue
+
+                files, complete = self._extract_jar(native_jar)
+                # A native that could not be replaced keeps its name for orphan cleanup but forces a retry next launch
+                current_jars[native_jar] = {"signature": signature if complete else None,
+                                            "digest": digest if complete else None, "files": files}
+            except (zipfile.BadZipFile, ValueError, IOError, OSError) as e:
                 logger.debug("Failed to extract native %s: %s", native_jar, e)
+                if native_jar in previous_jars:
+                    current_jars[native_jar] = previous_jars[native_jar]
+
+        self._remove_orphans(previous_jars, current_jars)
+        if current_jars != previous_jars:
+            self._save_state(current_jars)
@@ -4,6 +4,8 @@ import zipfile
 import sys
 import logging
 
+from app.core.runtimes import read_release
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,7 +19,7 @@ class AdvancedJavaManager:
             self.java_pkg_dir = os.path.join(root_dir, "app", "java_pkg")
         self.java_target_dir = os.path.join(self.java_pkg_dir, "runtime")
 
-    def get_java_executable(self):
+    def find_java_executable(self):
         java_name = "java.exe" if platform.system().lower() == "windows" else "java"
         
         java_exe = os.path.join(self.java_target_dir, "bin", java_name)
@@ -28,7 +30,14 @@ class AdvancedJavaManager:
             for root, _, files in os.walk(self.java_target_dir):
                 if java_name in files:
                     return os.path.join(root, java_name)
+        return None
+
+    def get_java_executable(self):
+        java_exe = self.find_java_executable()
+        if java_exe:
+            return java_exe
         
+        java_name = "java.exe" if platform.system().lower() == "windows" else "java"
         self._extract_java()
         
         if os.path.exists(self.java_target_dir):
@@ -38,6 +47,10 @@ class AdvancedJavaManager:
                     
         raise FileNotFoundError(f"Java not found in {self.java_pkg_dir}")
 
+    def get_java_version(self, java_exe):
+        release = read_release(os.path.dirname(os.path.dirname(java_exe)))
+        return release["major"] if release else None
+
     def _extract_java(self):
         if not os.path.exists(self.java_pkg_dir):
             raise FileNotFoundError(f"Java package not found: {self.java_pkg_dir}")
@@ -0,0 +1,163 @@
+import os
+import re
+import json
+import subprocess
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+FLAG_LINE = re.compile(r"^\s*[\w:]+\s+(\w+)\s+:?=\s*\S*\s*\{([^}]*)\}")
+VERSION_LINE = re.compile(r'version "(\d+)(?:\.(\d+))?')
+UNLOCK_FLAGS = ("UnlockExperimentalVMOptions", "UnlockDiagnosticVMOptions")
+COLLECTORS = {
+    "UseSerialGC": None, "UseParallelGC": None, "UseParallelOldGC": None, "UseParNewGC": None,
+    "UseConcMarkSweepGC": "CMS", "UseG1GC": "G1", "UseZGC": "Z", "UseShenandoahGC": "Shenandoah",
+}
+COLLECTOR_FAMILIES = ("G1", "CMS", "Shenandoah", "Z")
+# Flags removed outright (unrecognized, the JVM refuses to start) from the given major version
+REMOVED_FLAGS = {"CMSIncrementalMode": 9, "UseParNewGC": 10, "UseConcMarkSweepGC": 14, "UseParallelOldGC": 16}
+
+
+def java_major_from_output(output):
+    match = VERSION_LINE.search(output)
+    if not match:
+        return None
+    major = int(match.group(1))
+    return int(match.group(2) or 0) if major == 1 else major
+
+
+class JavaProbe:
+    PROBE_TIMEOUT = 20
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._cache = None
+
+    def _load(self):
+        if self._cache is None:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (IOError, OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except (IOError, OSError) as e:
+            logger.debug("Could not save Java probe cache: %s", e)
+
+    def _run_probe(self, java_exe):
+        creation_flags = 0x08000000 if os.name == "nt" else 0
+        result = subprocess.run([java_exe, "-XX:+UnlockExperimentalVMOptions", "-XX:+UnlockDiagnosticVMOptions",
+                                 "-XX:+PrintFlagsFinal", "-version"], capture_output=True, text=True,
+                                errors="replace", timeout=self.PROBE_TIMEOUT, creationflags=creation_flags)
+        flags = {}
+        for line in result.stdout.splitlines():
+            match = FLAG_LINE.match(line)
+            if match:
+                kinds = match.group(2).split()
+                flags[match.group(1)] = "experimental" if "experimental" in kinds else (
+                    "diagnostic" if "diagnostic" in kinds else "product")
+        return {"version": java_major_from_output(result.stderr + result.stdout), "flags": flags}
+
+    def probe(self, java_exe):
+        java_exe = os.path.abspath(java_exe)
+        try:
+            stat = os.stat(java_exe)
+        except OSError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+
+        with self._lock:
+            entry = self._load().get(java_exe)
+            if entry and entry.get("signature") == signature:
+                return entry
+            try:
+                entry = self._run_probe(java_exe)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug("Java flag probe failed for %s: %s", java_exe, e)
+                return None
+            if not entry["flags"]:
+                logger.debug("Java flag probe for %s returned no flags", java_exe)
+                return None
+            entry["signature"] = signature
+            self._cache[java_exe] = entry
+            self._save()
+            return entry
+
+
+def _flag_key(arg):
+    if arg.startswith("-XX:"):
+        body = arg[4:]
+        if body[:1] in ("+", "-"):
+            return body[1:], body[0] == "+"
+        return body.split("=", 1)[0], None
+    for prefix in ("-Xmx", "-Xms", "-Xmn", "-Xss", "-Xloggc", "-Xlog"):
+        if arg.startswith(prefix):
+            return prefix, None
+    if arg.startswith("-D"):
+        return "D:" + arg[2:].split("=", 1)[0], None
+    return arg, None
+
+
+def _collector_family(name):
+    for prefix in COLLECTOR_FAMILIES:
+        if name.startswith(prefix) and name[len(prefix):][:1].isupper():
+            return prefix
+    return None
+
+
+def filter_jvm_args(args, probe=None):
+    flags = probe.get("flags") if probe else None
+    version = probe.get("version") if probe else None
+
+    parsed = []
+    for arg in args:
+        name, enabled = _flag_key(arg)
+        if arg.startswith("-XX:") and name not in UNLOCK_FLAGS:
+            if flags is not None and name not in flags:
+                logger.info("Dropping JVM flag unsupported by this runtime: %s", arg)
+                continue
+            if flags is None and version and version >= REMOVED_FLAGS.get(name, 1000):
+                logger.info("Dropping JVM flag removed in Java %s: %s", REMOVED_FLAGS[name], arg)
+                continue
+        if name == "-Xlog" and version and version < 9:
+            logger.info("Dropping unified logging flag on Java %s: %s", version, arg)
+            continue
+        parsed.append((name, enabled, arg))
+
+    collector = None
+    for name, enabled, _ in parsed:
+        if name in COLLECTORS and enabled:
+            collector = name
+    family = COLLECTORS.get(collector)
+
+    seen = set()
+    kept = []
+    for name, enabled, arg in reversed(parsed):
+        if name in seen:
+            continue
+        seen.add(name)
+        if collector and name in COLLECTORS and enabled and name != collector:
+            logger.info("Dropping conflicting collector %s in favour of %s", arg, collector)
+            continue
+        if collector and _collector_family(name) not in (None, family):
+            continue
+        kept.append(arg)
+    kept.reverse()
+
+    rest = [arg for arg in kept if _flag_key(arg)[0] not in UNLOCK_FLAGS]
+    if flags is None:
+        unlocks = [arg for arg in kept if _flag_key(arg)[0] in UNLOCK_FLAGS]
+    else:
+        kinds = {flags.get(_flag_key(arg)[0]) for arg in rest}
+        unlocks = [f"-XX:+Unlock{kind.capitalize()}VMOptions" for kind in ("experimental", "diagnostic") if kind in kinds]
+    return unlocks + rest
@@ -1,9 +1,18 @@
 import os
+import json
 import platform
 import sys
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class DependencyResolver:
+    INDEX_VERSION = 1
+    CLIENT_JAR = "minecraft-b1.7.3-client.jar"
+    EXCLUDED_JARS = ("fabric-loader", "intermediary", "minecraft-", "natives")
+    NATIVE_SUFFIXES = {"windows": "natives-windows", "darwin": "natives-osx", "linux": "natives-linux"}
+
     def __init__(self, root_dir):
         self.root_dir = root_dir
         if getattr(sys, 'frozen', False):
@@ -11,44 +20,101 @@ class DependencyResolver:
             self.game_dir = os.path.join(base, "app", "game")
         else:
             self.game_dir = os.path.join(root_dir, "app", "game")
-             
+
         self.files_dir = self.game_dir
         self.libraries_dir = os.path.join(self.files_dir, "libraries")
-        
-    def resolve_classpath(self):
+        self.index_file = os.path.join(self.files_dir, ".classpath_index.json")
+        self._index = None
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r") as f:
+                    index = json.load(f)
+                if index.get("version") == self.INDEX_VERSION:
+                    return index
+            except (json.JSONDecodeError, IOError, OSError):
+                pass
+        return None
+
+    def _save_index(self, index):
+        try:
+            tmp_path = self.index_file + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_file)
+        except (IOError, OSError) as e:
+            logger.debug("Could not save classpath index: %s", e)
+
+    def _is_index_valid(self, index):
+        for rel_dir, mtime in index.get("dirs", {}).items():
+            try:
+                if os.stat(os.path.join(self.libraries_dir, rel_dir)).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _scan_dir(self, path, rel_dir, dirs, jars):
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_dir():
+                    subdirs.append(entry)
+                elif entry.name.endswith(".jar"):
+                    jars.append(f"{rel_dir}/{entry.name}" if rel_dir else entry.name)
+
+        for entry in subdirs:
+            sub_rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            dirs[sub_rel] = entry.stat().st_mtime_ns
+            self._scan_dir(entry.path, sub_rel, dirs, jars)
+
+    def _scan_libraries(self):
+        dirs = {"": os.stat(self.libraries_dir).st_mtime_ns}
+        jars = []
+        self._scan_dir(self.libraries_dir, "", dirs, jars)
+        return {"version": self.INDEX_VERSION, "dirs": dirs, "jars": jars}
+
+    def _get_library_jars(self):
+        if not os.path.exists(self.libraries_dir):
+            return []
+
+        index = self._load_index()
+        if index is None or not self._is_index_valid(index):
+            index = self._scan_libraries()
+            self._save_index(index)
+        self._index = index
+        return [os.path.join(self.libraries_dir, *jar.split("/")) for jar in index["jars"]]
+
+    def resolve(self):
         classpath = []
-        
+
         bta_jar = os.path.join(self.files_dir, "jarmods", "bta.jar")
         if os.path.exists(bta_jar):
             classpath.append(bta_jar)
-            
-        if os.path.exists(self.libraries_dir):
-            for root, _, files in os.walk(self.libraries_dir):
-                for file in files:
-                    if "minecraft-b1.7.3-client.jar" in file:
-                        classpath.append(os.path.join(root, file))
-                        break
-            
-            for root, _, files in os.walk(self.libraries_dir):
-                for file in files:
-                    if not file.endswith(".jar"): continue
-                    if any(x in file for x in ["fabric-loader", "intermediary", "minecraft-", "natives"]): continue
-                    classpath.append(os.path.join(root, file))
-        
-        return os.pathsep.join(classpath)
+
+        jars = self._get_library_jars()
+        client_dirs = set()
+        for jar in jars:
+            jar_dir, file = os.path.split(jar)
+            if self.CLIENT_JAR in file and jar_dir not in client_dirs:
+                client_dirs.add(jar_dir)
+                classpath.append(jar)
+
+        for jar in jars:
+            file = os.path.basename(jar)
+            if any(x in file for x in self.EXCLUDED_JARS): continue
+            classpath.append(jar)
+
+        native_suffix = self.NATIVE_SUFFIXES.get(platform.system().lower())
+        natives = [jar for jar in jars if native_suffix and native_suffix in os.path.basename(jar)]
+
+        return os.pathsep.join(classpath), natives
+
+    def resolve_classpath(self):
+        return self.resolve()[0]
 
     def get_natives(self):
-        natives = []
-        if not os.path.exists(self.libraries_dir):
-            return natives
-        
-        system = platform.system().lower()
-        native_suffix = {"windows": "natives-windows", "darwin": "natives-osx", "linux": "natives-linux"}.get(system)
-        
-        if native_suffix:
-            for root, _, files in os.walk(self.libraries_dir):
-                for file in files:
-                    if native_suffix in file and file.endswith(".jar"):
-                        natives.append(os.path.join(root, file))
-        
-        return natives
+        return self.resolve()[1]
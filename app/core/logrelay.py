@@ -0,0 +1,71 @@
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class LogRelay:
+    def __init__(self, emit, interval=0.1, history=5000, max_pending=2000, max_batch=500):
+        self.emit = emit
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self._history = deque(maxlen=history)
+        self._pending = deque()
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, line):
+        with self._lock:
+            self._history.append(line)
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._dropped += 1
+            self._pending.append(line)
+
+    def push_many(self, lines):
+        with self._lock:
+            self._history.extend(lines)
+            self._pending.extend(lines)
+            overflow = len(self._pending) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._pending.popleft()
+            self._dropped += max(overflow, 0)
+
+    def tail(self, n=200):
+        with self._lock:
+            if n <= 0:
+                return []
+            return list(self._history)[-n:]
+
+    def _take_batch(self):
+        with self._lock:
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            batch.insert(0, f"[launcher] {dropped} log lines skipped because the UI fell behind")
+        return batch
+
+    def flush(self):
+        batch = self._take_batch()
+        if not batch:
+            return False
+        try:
+            self.emit(batch)
+        except Exception as e:
+            logger.debug("Log relay emit failed: %s", e)
+        return True
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            self.flush()
+        while self.flush():
+            pass
+
+    def close(self, timeout=2.0):
+        self._closed.set()
+        self._thread.join(timeout)
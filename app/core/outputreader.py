@@ -0,0 +1,75 @@
+import os
+import locale
+import logging
+
+from app.core.sessionlog import parse_level
+
+logger = logging.getLogger(__name__)
+
+
+class OutputReader:
+    CHUNK_SIZE = 64 * 1024
+    MAX_LINE = 1024 * 1024
+
+    def __init__(self, stream, encoding=None, chunk_size=CHUNK_SIZE):
+        self.fd = stream.fileno()
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.chunk_size = chunk_size
+        self.lines_read = 0
+        self.bytes_read = 0
+        self._subscribers = []
+        self._pending = b""
+        self._last_level = None
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return self
+
+    def _emit(self, data):
+        batch = []
+        last_level = self._last_level
+        for line in data.decode(self.encoding, errors="replace").split("\n"):
+            if line.endswith("\r"):
+                line = line[:-1]
+            last_level = parse_level(line, last_level)
+            batch.append((line, last_level))
+        self._last_level = last_level
+        self.lines_read += len(batch)
+
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.debug("Output subscriber failed: %s", e)
+
+    def feed(self, chunk):
+        self.bytes_read += len(chunk)
+        data = self._pending + chunk if self._pending else chunk
+        end = data.rfind(b"\n")
+        if end < 0:
+            if len(data) < self.MAX_LINE:
+                self._pending = data
+                return
+            end = len(data)
+        self._pending = data[end + 1:]
+        self._emit(data[:end])
+
+    def finish(self):
+        if self._pending:
+            data, self._pending = self._pending, b""
+            self._emit(data)
+
+    def run(self, on_first_output=None):
+        while True:
+            try:
+                chunk = os.read(self.fd, self.chunk_size)
+            except OSError as e:
+                logger.debug("Game output pipe closed: %s", e)
+                break
+            if not chunk:
+                break
+            if on_first_output:
+                on_first_output()
+                on_first_output = None
+            self.feed(chunk)
+        self.finish()
@@ -0,0 +1,88 @@
+import io
+import os
+import re
+import json
+import zlib
+import zipfile
+import logging
+
+from app.core.anticheat import ScanCache
+from app.core.zipinspect import ZipInspector
+
+logger = logging.getLogger(__name__)
+
+FORMATTING_CODES = re.compile("§.")
+MAX_DESCRIPTION = 200
+
+
+def _component_text(component):
+    if isinstance(component, str):
+        return component
+    if isinstance(component, list):
+        return "".join(_component_text(part) for part in component)
+    if isinstance(component, dict):
+        return _component_text(component.get("text", "")) + _component_text(component.get("extra", []))
+    return ""
+
+
+def read_description(inspector):
+    text = None
+    if "pack.mcmeta" in inspector:
+        try:
+            meta = json.loads(inspector.read("pack.mcmeta").decode("utf-8-sig", errors="replace"))
+            text = _component_text(meta.get("pack", {}).get("description", ""))
+        except (ValueError, AttributeError):
+            text = None
+    if not text and "pack.txt" in inspector:
+        text = inspector.read("pack.txt").decode("utf-8", errors="replace")
+    if not text:
+        return None
+    text = " ".join(FORMATTING_CODES.sub("", text).split())
+    return text[:MAX_DESCRIPTION] or None
+
+
+class PackIndex:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.cache = ScanCache(path)
+
+    def _describe(self, zi, entry, path):
+        entry["entries"] = len(zi)
+        entry["icon"] = "pack.png" in zi
+        try:
+            entry["description"] = read_description(zi)
+        except (KeyError, ValueError, zlib.error, zipfile.BadZipFile) as e:
+            logger.debug("Could not read pack description from %s: %s", path, e)
+
+    def get(self, path, stat=None):
+        try:
+            stat = stat or os.stat(path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            cached = self.cache.get(path)
+            if cached and cached.get("signature") == signature:
+                return cached
+
+            entry = {"signature": signature, "valid": True, "entries": 0, "description": None, "icon": False}
+            try:
+                with ZipInspector(path) as zi:
+                    self._describe(zi, entry, path)
+            except zipfile.BadZipFile:
+                entry["valid"] = False
+        except (IOError, OSError) as e:
+            logger.debug("Could not index %s: %s", path, e)
+            return None
+        self.cache.set(path, entry, defer=True)
+        return entry
+
+    def read_icon(self, path):
+        with ZipInspector(path) as zi:
+            return io.BytesIO(zi.read("pack.png"))
+
+    def prune(self):
+        return self.cache.prune()
+
+    def flush(self):
+        self.cache.flush()
+
+    def close(self):
+        self.cache.close()
@@ -0,0 +1,85 @@
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from app.core.anticheat import SecurityViolation
+
+logger = logging.getLogger(__name__)
+
+
+class TaskGraph:
+    def __init__(self, max_workers=8, trace=None):
+        self.max_workers = max_workers
+        self.trace = trace
+        self.tasks = {}
+        self.timings = {}
+
+    def add(self, name, fn, deps=()):
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        self.tasks[name] = (fn, tuple(deps))
+        return self
+
+    def _validate(self):
+        for name, (_, deps) in self.tasks.items():
+            missing = [dep for dep in deps if dep not in self.tasks]
+            if missing:
+                raise ValueError(f"Task {name} depends on unknown tasks: {', '.join(missing)}")
+
+        resolved = set()
+        remaining = dict(self.tasks)
+        while remaining:
+            ready = [name for name, (_, deps) in remaining.items() if resolved.issuperset(deps)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    def _run_task(self, name, fn, inputs):
+        start = time.monotonic()
+        try:
+            return fn(inputs)
+        finally:
+            end = time.monotonic()
+            self.timings[name] = (start, end)
+            if self.trace:
+                self.trace.add_span(name, start, end, "prelaunch", threading.get_ident())
+
+    def run(self):
+        self._validate()
+        results = {}
+        pending = dict(self.tasks)
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="launch") as pool:
+            while pending or running:
+                if error is None:
+                    ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+                    for name in ready:
+                        fn, deps = pending.pop(name)
+                        inputs = {dep: results[dep] for dep in deps}
+                        running[pool.submit(self._run_task, name, fn, inputs)] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.debug("Launch step %s failed: %s", name, e)
+                        # A blocked launch must be reported as such even if another step failed first
+                        if error is None or (isinstance(e, SecurityViolation) and
+                                             not isinstance(error, SecurityViolation)):
+                            error = e
+
+        if error is not None:
+            raise error
+        return results
+
+    def durations_ms(self):
+        return {name: (end - start) * 1000 for name, (start, end) in
+                sorted(self.timings.items(), key=lambda item: item[1][0])}
@@ -3,12 +3,18 @@ import sys
 import shutil
 import json
 import hashlib
-import tarfile
 import time
+import threading
+import logging
+from app.core.extractor import AssetExtractor
+
+logger = logging.getLogger(__name__)
 
 
 class ResourceManager:
     ASSET_VERSION = "1.0.0"
+    # The game and launcher rewrite options, configs and saves, so only immutable content is deep verified
+    VERIFIED_PREFIXES = {"java": ("",), "game": ("game/libraries/", "game/jarmods/")}
     
     def __init__(self, root_dir):
         self.root_dir = root_dir
@@ -41,14 +47,48 @@ class ResourceManager:
         os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
         with open(manifest_path, 'w') as f:
             json.dump(manifest, f)
+
+    def _get_files_manifest_path(self, target_app_dir, key):
+        return os.path.join(target_app_dir, f".asset_files_{key}.json")
+
+    def _load_files_manifest(self, path):
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f).get("files", {})
+            except (json.JSONDecodeError, IOError, OSError, AttributeError):
+                pass
+        return {}
+
+    def _save_files_manifest(self, path, files):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": self.ASSET_VERSION, "files": files}, f)
+        os.replace(tmp_path, path)
     
+    def _calculate_archive_hash(self, archive_path):
+        if not os.path.isdir(archive_path):
+            return self._calculate_file_hash(archive_path)
+        try:
+            sources, _ = AssetExtractor.get_sources(archive_path)
+        except (json.JSONDecodeError, IOError, OSError):
+            return None
+        return self._combine_hashes([self._calculate_file_hash(path) for path in sources])
+
+    def _combine_hashes(self, hashes):
+        if len(hashes) == 1:
+            return hashes[0]
+        if not hashes or None in hashes:
+            return None
+        return hashlib.sha256("\n".join(hashes).encode()).hexdigest()
+
     def _calculate_file_hash(self, filepath):
         if not os.path.exists(filepath):
             return None
         try:
             file_hash = hashlib.sha256()
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
                     file_hash.update(chunk)
             return file_hash.hexdigest()
         except (IOError, OSError):
@@ -61,77 +101,159 @@ class ResourceManager:
             return all(os.path.exists(os.path.join(dest_dir, f)) for f in expected_files)
         return True
 
+    def _archive_signature(self, archive_path):
+        try:
+            if os.path.isdir(archive_path):
+                sources, _ = AssetExtractor.get_sources(archive_path)
+                paths = [os.path.join(archive_path, AssetExtractor.BUNDLE_INDEX)] + sources
+            else:
+                paths = [archive_path]
+            signature = []
+            for path in paths:
+                stat = os.stat(path)
+                signature.extend([stat.st_size, stat.st_mtime_ns, stat.st_ino])
+            return signature
+        except (json.JSONDecodeError, IOError, OSError):
+            return None
+
     def _needs_extraction(self, manifest, key, archive_path, dest_dir):
         cached = manifest.get(key, {})
-        current_hash = self._calculate_file_hash(archive_path)
         
         if cached.get("version") != self.ASSET_VERSION:
             return True
-        if current_hash != cached.get("archive_hash"):
-            return True
         if not self._validate_extraction(dest_dir):
             return True
+        
+        signature = self._archive_signature(archive_path)
+        if signature and signature == cached.get("archive_stat"):
+            return False
+        if self._calculate_archive_hash(archive_path) != cached.get("archive_hash"):
+            return True
+        cached["archive_stat"] = signature
         return False
 
-    def _extract_archive(self, archive_path, dest_dir, parent_dir, manifest, key):
-        if os.path.exists(dest_dir):
-            shutil.rmtree(dest_dir)
+    def _remove_stale(self, parent_dir, previous_files, current_files):
+        for rel_path in set(previous_files) - set(current_files):
+            path = os.path.join(parent_dir, rel_path)
+            try:
+                if os.path.isfile(path):
+                    os.remove(path)
+            except (IOError, OSError) as e:
+                logger.debug("Could not remove stale asset %s: %s", rel_path, e)
+
+    def _extract_archive(self, archive_path, dest_dir, parent_dir, manifest, key, files_manifest_path, force=False,
+                         on_progress=None):
         os.makedirs(parent_dir, exist_ok=True)
+        previous_files = {} if force else self._load_files_manifest(files_manifest_path)
+        if not os.path.exists(dest_dir):
+            previous_files = {}
         
-        def safe_members(tar_obj, dest_path):
-            for member in tar_obj.getmembers():
-                member_path = os.path.join(dest_path, member.name)
-                if not os.path.abspath(member_path).startswith(os.path.abspath(dest_path)):
-                    raise Exception(f"Path traversal: {member.name}")
-                yield member
+        sources, totals = AssetExtractor.get_sources(archive_path)
+        extractor = AssetExtractor(parent_dir, previous_files, on_progress=on_progress)
+        current_files, written, hashes = extractor.run(sources, totals)
+        archive_hash = self._combine_hashes(hashes)
         
-        with tarfile.open(archive_path, "r:xz") as tar:
-            tar.extractall(parent_dir, members=safe_members(tar, parent_dir))
+        self._remove_stale(parent_dir, previous_files, current_files)
+        self._save_files_manifest(files_manifest_path, current_files)
+        logger.info("Extracted %s: %d of %d files updated", key, written, len(current_files))
         
         manifest[key] = {
             "version": self.ASSET_VERSION,
-            "archive_hash": self._calculate_file_hash(archive_path),
+            "archive_hash": archive_hash,
+            "archive_stat": self._archive_signature(archive_path),
             "extracted_at": time.time()
         }
 
-    def extract_assets(self, force=False):
+    def _get_target_app_dir(self):
         if getattr(sys, 'frozen', False):
-            target_app_dir = os.path.join(os.path.dirname(sys.executable), "app")
-        else:
-            target_app_dir = self.app_dir
-        
+            return os.path.join(os.path.dirname(sys.executable), "app")
+        return self.app_dir
+
+    def _find_archive(self, name):
+        bundle_dir = os.path.join(self.assets_dir, f"{name}.bundle")
+        if os.path.exists(os.path.join(bundle_dir, AssetExtractor.BUNDLE_INDEX)):
+            return bundle_dir
+        return os.path.join(self.assets_dir, f"{name}.tar.xz")
+
+    def _get_archives(self, target_app_dir):
+        java_pkg = os.path.join(target_app_dir, "java_pkg")
+        return [
+            ("java", self._find_archive("java_win"), os.path.join(java_pkg, "runtime"), java_pkg),
+            ("game", self._find_archive("game"), os.path.join(target_app_dir, "game"), target_app_dir),
+        ]
+
+    def extract_assets(self, force=False, on_progress=None, skip=()):
+        target_app_dir = self._get_target_app_dir()
         manifest = self._load_manifest(target_app_dir)
-        manifest_updated = False
-        
-        java_xz = os.path.join(self.assets_dir, "java_win.tar.xz")
-        game_xz = os.path.join(self.assets_dir, "game.tar.xz")
-        java_dest = os.path.join(target_app_dir, "java_pkg", "runtime")
-        game_dest = os.path.join(target_app_dir, "game")
-        
-        if os.path.exists(java_xz) and (force or self._needs_extraction(manifest, "java", java_xz, java_dest)):
-            self._extract_archive(java_xz, java_dest, os.path.join(target_app_dir, "java_pkg"), manifest, "java")
-            manifest_updated = True
+        original = json.dumps(manifest, sort_keys=True)
         
-        if os.path.exists(game_xz) and (force or self._needs_extraction(manifest, "game", game_xz, game_dest)):
-            self._extract_archive(game_xz, game_dest, target_app_dir, manifest, "game")
-            manifest_updated = True
+        for key, archive_path, dest_dir, parent_dir in self._get_archives(target_app_dir):
+            if key in skip:
+                continue
+            if os.path.exists(archive_path) and (force or self._needs_extraction(manifest, key, archive_path, dest_dir)):
+                progress = (lambda *args, key=key: on_progress(key, *args)) if on_progress else None
+                self._extract_archive(archive_path, dest_dir, parent_dir, manifest, key,
+                                      self._get_files_manifest_path(target_app_dir, key), force, progress)
         
-        if manifest_updated:
+        if json.dumps(manifest, sort_keys=True) != original:
             self._save_manifest(target_app_dir, manifest)
         
         if getattr(sys, 'frozen', False):
             self.app_dir = os.path.join(os.path.dirname(sys.executable), "app")
+
+    def deep_verify(self):
+        target_app_dir = self._get_target_app_dir()
+        manifest = self._load_manifest(target_app_dir)
+        mismatched = []
+        
+        for key, archive_path, _, parent_dir in self._get_archives(target_app_dir):
+            cached = manifest.get(key)
+            if not cached or not os.path.exists(archive_path):
+                continue
+            
+            files_manifest_path = self._get_files_manifest_path(target_app_dir, key)
+            files = self._load_files_manifest(files_manifest_path)
+            prefixes = self.VERIFIED_PREFIXES.get(key, ("",))
+            corrupted = [rel_path for rel_path, entry in files.items() if rel_path.startswith(prefixes)
+                         and self._calculate_file_hash(os.path.join(parent_dir, rel_path)) != entry.get("digest")]
+            archive_changed = self._calculate_archive_hash(archive_path) != cached.get("archive_hash")
+            
+            if corrupted:
+                for rel_path in corrupted:
+                    files.pop(rel_path, None)
+                self._save_files_manifest(files_manifest_path, files)
+            if corrupted or archive_changed:
+                cached.pop("archive_stat", None)
+                cached["version"] = None
+                mismatched.append(key)
+                logger.warning("Deep verify of %s failed: %d corrupted files, archive changed: %s",
+                               key, len(corrupted), archive_changed)
+        
+        if mismatched:
+            self._save_manifest(target_app_dir, manifest)
+        return mismatched
+
+    def start_deep_verify(self, on_result=None):
+        def _run():
+            try:
+                mismatched = self.deep_verify()
+            except (IOError, OSError) as e:
+                logger.debug("Deep verify failed: %s", e)
+                return
+            if on_result:
+                on_result(mismatched)
+        
+        threading.Thread(target=_run, daemon=True).start()
     
     def clear_extracted_assets(self):
-        if getattr(sys, 'frozen', False):
-            target_app_dir = os.path.join(os.path.dirname(sys.executable), "app")
-        else:
-            target_app_dir = self.app_dir
+        target_app_dir = self._get_target_app_dir()
         
         paths = [
             os.path.join(target_app_dir, "java_pkg"),
             os.path.join(target_app_dir, "game"),
-            self._get_manifest_path(target_app_dir)
+            self._get_manifest_path(target_app_dir),
+            self._get_files_manifest_path(target_app_dir, "java"),
+            self._get_files_manifest_path(target_app_dir, "game")
         ]
         
         deleted = False
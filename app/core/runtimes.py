@@ -0,0 +1,152 @@
+import os
+import re
+import sys
+import glob
+import json
+import platform
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+LTS_VERSIONS = (8, 11, 17, 21, 25)
+ARCH_ALIASES = {"amd64": "x86_64", "x86_64": "x86_64", "x64": "x86_64", "aarch64": "aarch64", "arm64": "aarch64",
+                "x86": "x86", "i386": "x86", "i586": "x86", "i686": "x86"}
+JAVA_NAME = "java.exe" if os.name == "nt" else "java"
+
+
+def normalize_arch(arch):
+    return ARCH_ALIASES.get((arch or "").lower(), (arch or "").lower() or None)
+
+
+def parse_java_version(version):
+    parts = version.split("+")[0].split("-")[0].replace("_", ".").split(".")
+    try:
+        major = int(parts[0])
+        if major == 1 and len(parts) > 1:
+            major = int(parts[1])
+        return major
+    except ValueError:
+        return None
+
+
+def version_key(version):
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+def read_release(home):
+    values = {}
+    try:
+        with open(os.path.join(home, "release"), "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if "=" in line:
+                    key, value = line.split("=", 1)
+                    values[key.strip()] = value.strip().strip('"')
+    except (IOError, OSError):
+        return None
+    version = values.get("JAVA_VERSION")
+    if not version:
+        return None
+    return {"version": version, "major": parse_java_version(version),
+            "vendor": values.get("IMPLEMENTOR") or values.get("JAVA_VENDOR"),
+            "arch": normalize_arch(values.get("OS_ARCH")), "image": values.get("IMAGE_TYPE")}
+
+
+def _standard_locations():
+    home = os.path.expanduser("~")
+    if os.name == "nt":
+        roots = [os.environ.get(name) for name in ("ProgramFiles", "ProgramFiles(x86)", "ProgramW6432")]
+        if os.environ.get("LOCALAPPDATA"):
+            roots.append(os.path.join(os.environ["LOCALAPPDATA"], "Programs"))
+        vendors = ("Java", "Eclipse Adoptium", "Eclipse Foundation", "AdoptOpenJDK", "Zulu", "Microsoft",
+                   "BellSoft", "Amazon Corretto", "Semeru")
+        patterns = [os.path.join(root, vendor, "*") for root in roots if root for vendor in vendors]
+    elif sys.platform == "darwin":
+        patterns = ["/Library/Java/JavaVirtualMachines/*/Contents/Home",
+                    os.path.join(home, "Library/Java/JavaVirtualMachines/*/Contents/Home")]
+    else:
+        patterns = ["/usr/lib/jvm/*", "/usr/java/*", "/opt/java/*", "/opt/jdk*"]
+    patterns += [os.path.join(home, ".sdkman/candidates/java/*"), os.path.join(home, ".jdks/*")]
+    for pattern in patterns:
+        yield from glob.glob(pattern)
+
+
+class RuntimeRegistry:
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.host_arch = normalize_arch(platform.machine())
+        self._lock = threading.Lock()
+        self._runtimes = None
+
+    def _candidates(self):
+        for name in ("JAVA_HOME", "JDK_HOME"):
+            if os.environ.get(name):
+                yield os.environ[name], name
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            java_exe = os.path.join(directory, JAVA_NAME) if directory else None
+            if java_exe and os.path.isfile(java_exe):
+                yield os.path.dirname(os.path.dirname(os.path.realpath(java_exe))), "PATH"
+        for home in _standard_locations():
+            yield home, "system"
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return {entry["home"]: entry for entry in json.load(f).get("runtimes", [])}
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save_cache(self, runtimes):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"runtimes": runtimes}, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except (IOError, OSError) as e:
+            logger.debug("Could not save Java runtime registry: %s", e)
+
+    def _inspect(self, home, source, cached):
+        java_exe = os.path.join(home, "bin", JAVA_NAME)
+        try:
+            signature = [os.stat(java_exe).st_mtime_ns, os.stat(os.path.join(home, "release")).st_mtime_ns]
+        except OSError:
+            return None
+        if cached and cached.get("signature") == signature:
+            return dict(cached, source=source)
+        release = read_release(home)
+        if not release or not release["major"]:
+            return None
+        return dict(release, home=home, java=java_exe, source=source, signature=signature)
+
+    def discover(self, refresh=False):
+        with self._lock:
+            if self._runtimes is not None and not refresh:
+                return list(self._runtimes)
+            cached = {} if refresh else self._load_cache()
+            runtimes, seen = [], set()
+            for home, source in self._candidates():
+                home = os.path.normcase(os.path.realpath(home))
+                if home in seen:
+                    continue
+                seen.add(home)
+                entry = self._inspect(home, source, cached.get(home))
+                if entry:
+                    runtimes.append(entry)
+            runtimes.sort(key=lambda r: version_key(r["version"]), reverse=True)
+            self._save_cache(runtimes)
+            self._runtimes = runtimes
+            return list(runtimes)
+
+    def select(self, min_version=8, max_version=None):
+        best, best_key = None, None
+        for runtime in self.discover():
+            major = runtime["major"]
+            if major < min_version or (max_version and major > max_version):
+                continue
+            if runtime.get("arch") and self.host_arch and runtime["arch"] != self.host_arch:
+                continue
+            key = (runtime.get("arch") == self.host_arch, major in LTS_VERSIONS, version_key(runtime["version"]))
+            if best_key is None or key > best_key:
+                best, best_key = runtime, key
+        return best
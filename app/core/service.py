@@ -3,10 +3,21 @@ from app.core.launcher import DependencyResolver
 from app.core.integrity import InstanceDoctor
 from app.core.java import AdvancedJavaManager
 from app.core.skins import SkinSystem
+from app.core.pipeline import TaskGraph
+from app.core.tracing import LaunchTrace
+from app.core.sessionlog import SessionLog
+from app.core.outputreader import OutputReader
+from app.core.telemetry import ProcessSampler, recommend_max_ram
+from app.core.gclog import gc_log_args, analyze_file
+from app.core.jvmflags import JavaProbe, filter_jvm_args
+from app.core.runtimes import RuntimeRegistry
+from app.core.packindex import PackIndex
+from app.core.resources import ResourceManager
 import os
 import sys
 import subprocess
 import threading
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +26,7 @@ logger = logging.getLogger(__name__)
 class LauncherService:
     ALLOWED_JVM_PREFIXES = ('-Xmx', '-Xms', '-Xmn', '-Xss', '-XX:', '-D')
     BLOCKED_JVM_PATTERNS = ('-agentpath', '-javaagent', '-agentlib', 'file:', 'http:', 'https:', '|', '&', ';', '`', '$')
+    JAVA_VERSION_RANGE = (8, 21)
 
     def __init__(self, root_dir):
         self.root_dir = root_dir
@@ -24,111 +36,244 @@ class LauncherService:
         self.process = None
         self.anticheat = None
         self.skin_system = SkinSystem(self.resolver.game_dir)
+        if getattr(sys, 'frozen', False):
+            self.data_dir = os.path.join(os.path.dirname(sys.executable), ".launcher")
+        else:
+            self.data_dir = os.path.join(root_dir, ".launcher")
+        self.traces_dir = os.path.join(self.data_dir, "traces")
+        self.java_probe = JavaProbe(os.path.join(self.data_dir, "java_probe.json"))
+        self.runtimes = RuntimeRegistry(os.path.join(self.data_dir, "java_runtimes.json"))
+        self.pack_index = PackIndex(os.path.join(self.data_dir, "pack_index.json"))
+        self.logs_dir = os.path.join(self.data_dir, "logs")
+        self.last_trace = None
+        self.last_session = None
+        self.sampler = None
+        self.last_metrics = None
+
+    def _find_java(self, config):
+        java_exe = config.get("java_path")
+        if java_exe and os.path.exists(java_exe):
+            return java_exe
+        
+        mode = config.get("java_runtime", "auto")
+        if mode in ("auto", "system"):
+            runtime = self.runtimes.select(*self.JAVA_VERSION_RANGE)
+            if runtime:
+                logger.info("Using %s Java %s from %s", runtime.get("vendor") or "system", runtime["version"], runtime["home"])
+                return runtime["java"]
+            logger.info("No suitable system Java found, falling back to the bundled runtime")
+        if not self.java_mgr.find_java_executable():
+            # Startup skips the bundled runtime while a system Java is available
+            ResourceManager(self.root_dir).extract_assets(skip=("game",))
+        return self.java_mgr.get_java_executable()
+
+    def needs_bundled_java(self, config):
+        java_exe = config.get("java_path")
+        if java_exe and os.path.exists(java_exe):
+            return False
+        if config.get("java_runtime", "auto") == "bundled":
+            return True
+        return self.runtimes.select(*self.JAVA_VERSION_RANGE) is None
+
+    def _build_jvm_args(self, config):
+        jvm_args = self.java_mgr.get_jvm_args(config.get("max_ram", 2048))
+        perf = dict(config.get("performance", {}))
+        
+        if perf.get("microstutter", False):
+            jvm_args.extend(["-XX:+UseConcMarkSweepGC", "-XX:+CMSIncrementalMode", "-XX:-UseAdaptiveSizePolicy", "-Xmn128M"])
+            perf["g1gc"] = False
+        
+        if perf.get("g1gc", True):
+            jvm_args.extend(["-XX:+UseG1GC", "-XX:+UnlockExperimentalVMOptions", "-XX:G1NewSizePercent=20", 
+                             "-XX:G1ReservePercent=20", "-XX:MaxGCPauseMillis=50", "-XX:G1HeapRegionSize=32M"])
+        
+        if perf.get("pretouch", True): jvm_args.append("-XX:+AlwaysPreTouch")
+        if perf.get("parallel", True): jvm_args.append("-XX:+ParallelRefProcEnabled")
+        if perf.get("nobiasedlock", True): jvm_args.append("-XX:-UseBiasedLocking")
+        if perf.get("codecache", True): jvm_args.extend(["-XX:ReservedCodeCacheSize=512m", "-XX:+UseCodeCacheFlushing"])
+        if perf.get("inlining", True): jvm_args.extend(["-XX:MaxInlineSize=420", "-XX:FreqInlineSize=500", "-XX:InlineSmallCode=2000"])
+        if perf.get("noexplicitgc", True): jvm_args.append("-XX:+DisableExplicitGC")
+        if perf.get("tiered", True): jvm_args.extend(["-XX:+TieredCompilation", "-XX:TieredStopAtLevel=4"])
+        if perf.get("stringdedup", False): jvm_args.append("-XX:+UseStringDeduplication")
+        
+        custom_args = config.get("custom_jvm_args", "")
+        for arg in custom_args.split():
+            if any(b in arg.lower() for b in self.BLOCKED_JVM_PATTERNS): continue
+            if not any(arg.startswith(p) for p in self.ALLOWED_JVM_PREFIXES): continue
+            jvm_args.append(arg)
+        return jvm_args
+
+    def _resolve_uuid(self, config):
+        uuid = config.get("uuid", "00000000-0000-0000-0000-000000000000")
+        if config.get("auth_type", "offline") == "elyby":
+            try:
+                elyby_profile = self.skin_system.get_elyby_profile(config.get("username", "Player"))
+                if elyby_profile and elyby_profile.get("id"):
+                    uuid = elyby_profile["id"]
+            except (IOError, OSError, ValueError) as e:
+                logger.debug("Ely.by profile lookup failed: %s", e)
+        return uuid
 
-    def launch(self, config, on_log=None, on_exit=None):
+    def _build_game_args(self, config, game_dir, uuid):
+        return ["net.minecraft.client.Minecraft", "--username", config.get("username", "Player"),
+                "--session", config.get("access_token", "0"), "--gameDir", game_dir,
+                "--width", str(config.get("width", 854)), "--height", str(config.get("height", 480)), "--uuid", uuid]
+
+    def _setup_skins(self, config):
+        username = config.get("username", "Player")
+        try:
+            if config.get("auth_type", "offline") == "microsoft":
+                skin_url = config.get("microsoft_skin_url")
+                if skin_url:
+                    self.skin_system.download_skin_from_url(username, skin_url)
+            self.skin_system.setup_for_launch(username, config.get("skin_path"))
+        except (IOError, OSError) as e:
+            logger.debug("Skin setup failed: %s", e)
+
+    def _get_authlib_args(self, config):
+        if config.get("auth_type", "offline") == "elyby":
+            authlib_path = self._find_authlib_injector()
+            if authlib_path:
+                return [f"-javaagent:{authlib_path}=https://authserver.ely.by"]
+        return []
+
+    def _get_gc_log_args(self, config, java_exe, gc_log_path, probe=None):
+        if not gc_log_path or not config.get("performance", {}).get("gclog", False):
+            return []
+        java_major = (probe or {}).get("version") or self.java_mgr.get_java_version(java_exe)
+        if not java_major:
+            logger.debug("Unknown Java version for %s, GC logging skipped", java_exe)
+        return gc_log_args(gc_log_path, java_major)
+
+    def _build_launch_graph(self, config, game_dir, trace=None, gc_log_path=None):
+        graph = TaskGraph(trace=trace)
+        graph.add("scan_assets", lambda _: self.anticheat.scan_assets())
+        graph.add("scan_mods", lambda _: self.anticheat.scan_mods())
+        # Steps that touch the network, the game directory or spawn processes wait for the security scans
+        scanned = ["scan_assets", "scan_mods"]
+        graph.add("java", lambda _: self._find_java(config))
+        graph.add("libraries", lambda _: self.resolver.resolve())
+        graph.add("natives", lambda deps: self.doctor.heal(deps["libraries"][1]), deps=["libraries"] + scanned)
+        graph.add("jvm_args", lambda _: self._build_jvm_args(config))
+        graph.add("java_probe", lambda deps: self.java_probe.probe(deps["java"]), deps=["java"] + scanned)
+        graph.add("gc_log", lambda deps: self._get_gc_log_args(config, deps["java"], gc_log_path, deps["java_probe"]),
+                  deps=["java", "java_probe"])
+        graph.add("profile", lambda _: self._resolve_uuid(config), deps=scanned)
+        graph.add("game_args", lambda deps: self._build_game_args(config, game_dir, deps["profile"]), deps=["profile"])
+        graph.add("skins", lambda _: self._setup_skins(config), deps=scanned)
+        graph.add("options", lambda _: self._set_fullscreen_option(game_dir, config.get("fullscreen", False)),
+                  deps=scanned)
+        graph.add("authlib", lambda _: self._get_authlib_args(config))
+        return graph
+
+    def prepare_launch(self, config, trace=None, gc_log_path=None):
+        game_dir = self.resolver.game_dir
+        self.anticheat = AntiCheat(game_dir)
+        graph = self._build_launch_graph(config, game_dir, trace, gc_log_path)
+        try:
+            steps = graph.run()
+        finally:
+            logger.info("Pre-launch steps: %s", ", ".join(
+                f"{name} {ms:.0f}ms" for name, ms in graph.durations_ms().items()))
+        
+        classpath = steps["libraries"][0]
+        jvm_args = filter_jvm_args(steps["jvm_args"] + steps["gc_log"], steps["java_probe"])
+        full_cmd = ([steps["java"]] + steps["authlib"] + jvm_args +
+                    [f"-Djava.library.path={self.doctor.natives_dir}", "-cp", classpath] + steps["game_args"])
+        return full_cmd, steps
+
+    def launch(self, config, on_log=None, on_exit=None, on_output=None):
         def _run():
+            trace = LaunchTrace()
+            self.last_trace = trace
+            session_log = None
             try:
                 game_dir = self.resolver.game_dir
-                self.anticheat = AntiCheat(game_dir)
                 
                 try:
-                    self.anticheat.scan_assets()
-                    self.anticheat.scan_mods()
+                    session_log = SessionLog(self.logs_dir)
+                    self.last_session = session_log.session
+                    gc_log_path = os.path.join(self.logs_dir, f"{session_log.session}.gc.log")
+                except (IOError, OSError) as e:
+                    logger.debug("Session log unavailable: %s", e)
+                    session_log = gc_log_path = None
+                
+                try:
+                    with trace.span("prelaunch"):
+                        full_cmd, steps = self.prepare_launch(config, trace, gc_log_path)
                 except SecurityViolation as e:
+                    if session_log: session_log.close()
                     if on_log: on_log(f"SECURITY: {e}")
                     if on_exit: on_exit(1)
                     return
-
-                java_exe = config.get("java_path")
-                if not java_exe or not os.path.exists(java_exe):
-                    java_exe = self.java_mgr.get_java_executable()
-                
-                classpath = self.resolver.resolve_classpath()
-                natives = self.resolver.get_natives()
-                self.doctor.heal(natives)
-                
-                jvm_args = self.java_mgr.get_jvm_args(config.get("max_ram", 2048))
-                perf = config.get("performance", {})
-                
-                if perf.get("microstutter", False):
-                    jvm_args.extend(["-XX:+UseConcMarkSweepGC", "-XX:+CMSIncrementalMode", "-XX:-UseAdaptiveSizePolicy", "-Xmn128M"])
-                    perf["g1gc"] = False
-                
-                if perf.get("g1gc", True):
-                    jvm_args.extend(["-XX:+UseG1GC", "-XX:+UnlockExperimentalVMOptions", "-XX:G1NewSizePercent=20", 
-                                     "-XX:G1ReservePercent=20", "-XX:MaxGCPauseMillis=50", "-XX:G1HeapRegionSize=32M"])
-                
-                if perf.get("pretouch", True): jvm_args.append("-XX:+AlwaysPreTouch")
-                if perf.get("parallel", True): jvm_args.append("-XX:+ParallelRefProcEnabled")
-                if perf.get("nobiasedlock", True): jvm_args.append("-XX:-UseBiasedLocking")
-                if perf.get("codecache", True): jvm_args.extend(["-XX:ReservedCodeCacheSize=512m", "-XX:+UseCodeCacheFlushing"])
-                if perf.get("inlining", True): jvm_args.extend(["-XX:MaxInlineSize=420", "-XX:FreqInlineSize=500", "-XX:InlineSmallCode=2000"])
-                if perf.get("noexplicitgc", True): jvm_args.append("-XX:+DisableExplicitGC")
-                if perf.get("tiered", True): jvm_args.extend(["-XX:+TieredCompilation", "-XX:TieredStopAtLevel=4"])
-                if perf.get("stringdedup", False): jvm_args.append("-XX:+UseStringDeduplication")
-                
-                custom_args = config.get("custom_jvm_args", "")
-                for arg in custom_args.split():
-                    if any(b in arg.lower() for b in self.BLOCKED_JVM_PATTERNS): continue
-                    if not any(arg.startswith(p) for p in self.ALLOWED_JVM_PREFIXES): continue
-                    jvm_args.append(arg)
-
-                username = config.get("username", "Player")
-                uuid = config.get("uuid", "00000000-0000-0000-0000-000000000000")
-                token = config.get("access_token", "0")
-                auth_type = config.get("auth_type", "offline")
-                
-                if auth_type == "elyby":
-                    try:
-                        elyby_profile = self.skin_system.get_elyby_profile(username)
-                        if elyby_profile and elyby_profile.get("id"):
-                            uuid = elyby_profile["id"]
-                    except (IOError, OSError, ValueError) as e:
-                        logger.debug("Ely.by profile lookup failed: %s", e)
-                
-                game_args = ["net.minecraft.client.Minecraft", "--username", username, "--session", token,
-                             "--gameDir", game_dir, "--width", str(config.get("width", 854)),
-                             "--height", str(config.get("height", 480)), "--uuid", uuid]
-                
-                try:
-                    if auth_type == "microsoft":
-                        skin_url = config.get("microsoft_skin_url")
-                        if skin_url:
-                            self.skin_system.download_skin_from_url(username, skin_url)
-                    self.skin_system.setup_for_launch(username, config.get("skin_path"))
-                except (IOError, OSError) as e:
-                    logger.debug("Skin setup failed: %s", e)
-                
-                self._set_fullscreen_option(game_dir, config.get("fullscreen", False))
-                
-                authlib_args = []
-                if auth_type == "elyby":
-                    authlib_path = self._find_authlib_injector()
-                    if authlib_path:
-                        authlib_args = [f"-javaagent:{authlib_path}=https://authserver.ely.by"]
-                
-                full_cmd = [java_exe] + authlib_args + jvm_args + [f"-Djava.library.path={self.doctor.natives_dir}", "-cp", classpath] + game_args
                 
                 creation_flags = 0x00000010 if config.get("show_console", False) else 0x08000000
                 
-                self.process = subprocess.Popen(full_cmd, cwd=game_dir, stdout=subprocess.PIPE,
-                                                stderr=subprocess.STDOUT, text=True, bufsize=1, creationflags=creation_flags)
+                spawn_start = time.monotonic()
+                with trace.span("jvm.spawn"):
+                    self.process = subprocess.Popen(full_cmd, cwd=game_dir, stdout=subprocess.PIPE,
+                                                    stderr=subprocess.STDOUT, bufsize=0, creationflags=creation_flags)
                 
                 self.anticheat.monitor(self.process, lambda msg: on_log(f"SECURITY: {msg}") if on_log else None)
+                self.sampler = ProcessSampler(self.process.pid, config.get("telemetry_interval", 2.0)).start()
+                self.last_metrics = None
                 
-                while self.process.poll() is None:
-                    line = self.process.stdout.readline()
-                    if line and on_log: on_log(line.strip())
-                        
+                def on_first_output():
+                    trace.add_span("jvm.first_output", spawn_start, time.monotonic(), "game")
+                    trace.save(self.traces_dir)
+                
+                reader = OutputReader(self.process.stdout)
+                if session_log: reader.subscribe(session_log.write_batch)
+                if on_output:
+                    reader.subscribe(lambda batch: on_output([line for line, _ in batch]))
+                elif on_log:
+                    def log_batch(batch):
+                        for line, _ in batch:
+                            if line: on_log(line.strip())
+                    reader.subscribe(log_batch)
+                reader.run(on_first_output)
+                self.process.stdout.close()
+                self.process.wait()
+                
+                self.sampler.stop()
+                self.last_metrics = self._finish_metrics(config, session_log, steps["gc_log"] and gc_log_path)
+                if session_log: session_log.close()
+                trace.add_span("game.session", spawn_start, time.monotonic(), "game")
+                trace.save(self.traces_dir)
                 if on_exit: on_exit(self.process.returncode)
                     
             except Exception as e:
                 logger.error("Launch failed: %s", e)
+                trace.mark("launch.failed")
+                trace.save(self.traces_dir)
+                if session_log: session_log.close()
                 if on_log: on_log(f"Error: {e}")
                 if on_exit: on_exit(-1)
 
         threading.Thread(target=_run, daemon=True).start()
 
+    def _finish_metrics(self, config, session_log, gc_log_path=None):
+        total_ram_mb = None
+        try:
+            import psutil
+            total_ram_mb = psutil.virtual_memory().total // (1024 * 1024)
+        except ImportError:
+            pass
+        gc_summary = None
+        if gc_log_path:
+            try:
+                gc_summary = analyze_file(gc_log_path)
+            except (IOError, OSError) as e:
+                logger.debug("Could not analyze GC log: %s", e)
+        heap_after_gc = gc_summary["heap_after_gc_mb"]["max"] if gc_summary else None
+        summary = self.sampler.summary()
+        recommendation = recommend_max_ram(config.get("max_ram", 2048), summary["peak_rss_mb"], total_ram_mb, heap_after_gc)
+        if session_log:
+            self.sampler.save(os.path.join(self.logs_dir, f"{session_log.session}.metrics.json"),
+                              max_ram=config.get("max_ram", 2048), performance=config.get("performance", {}),
+                              recommendation=recommendation, gc=gc_summary)
+        return {"summary": summary, "recommendation": recommendation, "gc": gc_summary}
+
     def _find_authlib_injector(self):
         paths = [
             os.path.join(self.root_dir, "app", "authlib-injector.jar"),
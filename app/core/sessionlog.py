@@ -0,0 +1,302 @@
+import os
+import re
+import gzip
+import json
+import time
+import zlib
+import bisect
+import base64
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+LEVEL_PATTERN = re.compile(r"[/\[](TRACE|DEBUG|INFO|WARN|WARNING|ERROR|SEVERE|FATAL)\]")
+LEVEL_ALIASES = {"WARNING": "WARN", "SEVERE": "ERROR"}
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+INDEX_TOKEN_PATTERN = re.compile(r"[^\W\d]\w+")
+LEVEL_CODES = {"T": "TRACE", "D": "DEBUG", "I": "INFO", "W": "WARN", "E": "ERROR", "F": "FATAL"}
+GRAM = 3
+
+
+def parse_level(line, previous=None):
+    match = LEVEL_PATTERN.search(line, 0, 160)
+    if match:
+        level = match.group(1)
+        return LEVEL_ALIASES.get(level, level)
+    if previous and (line[:1] in (" ", "\t") or line.startswith("Caused by")):
+        return previous
+    return previous if previous in ("ERROR", "FATAL") and "Exception" in line[:120] else None
+
+
+def tokenize(text):
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def trigrams(text):
+    return {"".join(gram) for gram in set(zip(*(text[i:] for i in range(GRAM))))}
+
+
+class _Bloom:
+    HASHES = 4
+
+    def __init__(self, bits, data=None):
+        self.bits = bits
+        self.data = data if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        bloom = cls(max(8192, len(tokens) * 10))
+        for token in tokens:
+            bloom.add(token)
+        return bloom
+
+    def _positions(self, token):
+        raw = token.encode("utf-8")
+        h1 = zlib.crc32(raw)
+        h2 = zlib.adler32(raw) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.HASHES)]
+
+    def add(self, token):
+        data = self.data
+        for pos in self._positions(token):
+            data[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, token):
+        return all(self.data[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(token))
+
+    def encode(self):
+        return base64.b64encode(bytes(self.data)).decode("ascii")
+
+    @classmethod
+    def decode(cls, bits, text):
+        return cls(bits, bytearray(base64.b64decode(text)))
+
+
+class SessionLog:
+    BLOCK_SIZE = 64 * 1024
+    PART_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, logs_dir, keep=30):
+        self.logs_dir = logs_dir
+        os.makedirs(logs_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.session = f"session-{stamp}"
+        suffix = 1
+        while os.path.exists(self._index_path(self.session)):
+            suffix += 1
+            self.session = f"session-{stamp}-{suffix}"
+
+        self._lock = threading.Lock()
+        self._index = open(self._index_path(self.session), "a", encoding="utf-8")
+        self._part = 0
+        self._part_file = None
+        self._line_no = 0
+        self._last_level = None
+        self._reset_block()
+        prune_sessions(logs_dir, keep, exclude=self.session)
+
+    def _index_path(self, session):
+        return os.path.join(self.logs_dir, f"{session}.idx")
+
+    def _part_path(self, part):
+        return os.path.join(self.logs_dir, f"{self.session}.{part}.log.gz")
+
+    def _reset_block(self):
+        self._block = []
+        self._block_size = 0
+        self._block_first = self._line_no
+        self._block_carry = self._last_level
+        self._block_levels = set()
+        self._block_tokens = set()
+        self._block_starts = []
+        self._block_marks = []
+        self._block_t0 = None
+
+    def write(self, line, level=None):
+        with self._lock:
+            self._write(line, level)
+
+    def write_batch(self, batch):
+        with self._lock:
+            for line, level in batch:
+                self._write(line, level)
+
+    def _write(self, line, level):
+        if level is None:
+            level = parse_level(line, self._last_level)
+        self._last_level = level
+        if self._block_t0 is None:
+            self._block_t0 = time.time()
+        if level:
+            self._block_levels.add(level)
+        self._block_tokens.update(INDEX_TOKEN_PATTERN.findall(line.lower()))
+        self._block_starts.append(self._block_size)
+        self._block_marks.append(level[0] if level else "-")
+        self._block.append(line)
+        self._block_size += len(line) + 1
+        self._line_no += 1
+        if self._block_size >= self.BLOCK_SIZE:
+            self._flush_block()
+
+    def _flush_block(self):
+        if not self._block:
+            return
+        try:
+            if self._part_file is None or self._part_file.tell() >= self.PART_SIZE:
+                if self._part_file:
+                    self._part_file.close()
+                    self._part += 1
+                self._part_file = open(self._part_path(self._part), "ab")
+            text = "\n".join(self._block) + "\n"
+            raw = text.encode("utf-8", errors="replace")
+            data = gzip.compress(raw, compresslevel=6)
+            offset = self._part_file.tell()
+            self._part_file.write(data)
+            self._part_file.flush()
+
+            # Trigrams are prefixed so they never collide with whole tokens in the same filter
+            bloom = _Bloom.from_tokens(self._block_tokens | {"#" + gram for gram in trigrams(text.lower())})
+            entry = {"part": self._part, "offset": offset, "length": len(data),
+                     "first_line": self._block_first, "lines": len(self._block), "carry": self._block_carry,
+                     "levels": "".join(sorted(level[0] for level in self._block_levels)),
+                     "t0": round(self._block_t0, 3), "t1": round(time.time(), 3),
+                     "starts": self._block_starts, "marks": "".join(self._block_marks),
+                     "bits": bloom.bits, "bloom": bloom.encode(), "grams": GRAM}
+            self._index.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._index.flush()
+        except (IOError, OSError) as e:
+            logger.debug("Could not write session log block: %s", e)
+        self._reset_block()
+
+    def flush(self):
+        with self._lock:
+            self._flush_block()
+
+    def close(self):
+        with self._lock:
+            self._flush_block()
+            if self._part_file:
+                self._part_file.close()
+                self._part_file = None
+            self._index.close()
+
+
+def _read_index(logs_dir, session):
+    blocks = []
+    try:
+        with open(os.path.join(logs_dir, f"{session}.idx"), "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    blocks.append(json.loads(raw))
+                except ValueError:
+                    break
+    except (IOError, OSError) as e:
+        logger.debug("Could not read log index for %s: %s", session, e)
+    return blocks
+
+
+def list_sessions(logs_dir):
+    try:
+        names = [name[:-4] for name in os.listdir(logs_dir) if name.endswith(".idx")]
+    except OSError:
+        return []
+    return sorted(names, reverse=True)
+
+
+def prune_sessions(logs_dir, keep, exclude=None):
+    sessions = [s for s in list_sessions(logs_dir) if s != exclude]
+    stale = set(sessions[max(keep - 1, 0):])
+    if not stale:
+        return
+    for name in os.listdir(logs_dir):
+        if name.split(".", 1)[0] in stale:
+            try:
+                os.remove(os.path.join(logs_dir, name))
+            except OSError:
+                pass
+
+
+def _block_lines(block, text):
+    if "starts" in block and "marks" in block:
+        return block["starts"], block["marks"]
+    # Rows written before per-line offsets were indexed
+    starts, marks, pos = [], [], 0
+    previous = block.get("carry")
+    for line in text.split("\n")[:-1]:
+        previous = parse_level(line, previous)
+        starts.append(pos)
+        marks.append(previous[0] if previous else "-")
+        pos += len(line) + 1
+    return starts, "".join(marks)
+
+
+def _candidate_lines(lowered, starts, terms):
+    # Jump from each hit of the longest term straight to its line instead of walking every line
+    term = max(terms, key=len)
+    found = set()
+    pos = lowered.find(term)
+    while pos >= 0:
+        i = bisect.bisect_right(starts, pos) - 1
+        found.add(i)
+        nxt = starts[i + 1] if i + 1 < len(starts) else len(lowered)
+        pos = lowered.find(term, nxt)
+    return sorted(found)
+
+
+def search_logs(logs_dir, query="", session=None, level=None, limit=200, whole_words=False):
+    terms = tokenize(query) if whole_words else set(query.lower().split())
+    tokens = set(INDEX_TOKEN_PATTERN.findall(query.lower())) if whole_words else set()
+    grams = {"#" + gram for term in terms for gram in trigrams(term)}
+    level_name = LEVEL_ALIASES.get(level.upper(), level.upper()) if level else None
+    level_code = level_name[0] if level_name else None
+    sessions = [name for name in list_sessions(logs_dir) if not session or name == session]
+    matches = []
+
+    for name in sessions:
+        open_parts = {}
+        try:
+            for block in _read_index(logs_dir, name):
+                if level_code and level_code not in block["levels"]:
+                    continue
+                # Terms shorter than a trigram and rows from older indexes can only be filtered by reading the block
+                indexed = tokens | grams if block.get("grams") == GRAM else tokens
+                if indexed:
+                    bloom = _Bloom.decode(block["bits"], block["bloom"])
+                    if not all(token in bloom for token in indexed):
+                        continue
+
+                part = block["part"]
+                if part not in open_parts:
+                    open_parts[part] = open(os.path.join(logs_dir, f"{name}.{part}.log.gz"), "rb")
+                f = open_parts[part]
+                f.seek(block["offset"])
+                text = gzip.decompress(f.read(block["length"])).decode("utf-8", errors="replace")
+                lowered = text.lower()
+                if not all(term in lowered for term in terms):
+                    continue
+
+                starts, marks = _block_lines(block, text)
+                if terms and len(lowered) == len(text):
+                    candidates = _candidate_lines(lowered, starts, terms)
+                else:
+                    candidates = range(len(starts))
+                for i in candidates:
+                    if level_code and marks[i] != level_code:
+                        continue
+                    end = starts[i + 1] - 1 if i + 1 < len(starts) else len(text) - 1
+                    line = text[starts[i]:end]
+                    if terms and not all(term in line.lower() for term in terms):
+                        continue
+                    if whole_words and not terms.issubset(tokenize(line)):
+                        continue
+                    matches.append({"session": name, "line": block["first_line"] + i + 1,
+                                    "level": LEVEL_CODES.get(marks[i]), "text": line})
+                    if len(matches) >= limit:
+                        return matches
+        except (IOError, OSError, EOFError, KeyError, IndexError) as e:
+            logger.debug("Could not search session %s: %s", name, e)
+        finally:
+            for f in open_parts.values():
+                f.close()
+    return matches
@@ -12,8 +12,9 @@ class SettingsManager:
         "fullscreen": False, "close_launcher": True, "performance_mode": "Balanced",
         "custom_jvm_args": "", "language": "en", "show_console": False,
         "username": "Player", "auth_type": "offline", "uuid": "", "access_token": "",
-        "optimize_jvm": True, "java_path": "", "game_dir": "", "debug_mode": False, "first_run": True,
-        "performance": {"g1gc": True, "pretouch": True, "largepages": False, "parallel": True, "aggressive": False, "stringdedup": False}
+        "optimize_jvm": True, "java_path": "", "java_runtime": "auto", "game_dir": "", "debug_mode": False, "first_run": True,
+        "deep_verify_assets": False, "telemetry_interval": 2.0,
+        "performance": {"g1gc": True, "pretouch": True, "largepages": False, "parallel": True, "aggressive": False, "stringdedup": False, "gclog": False}
     }
 
     def __init__(self, root_dir):
@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+import logging
+from collections import deque
+
+from app.core.watcher import create_watcher
+
+logger = logging.getLogger(__name__)
+
+
+class FolderSnapshot:
+    def __init__(self, folder, extensions, on_change=None, history=1000, backend=None):
+        self.folder = os.path.abspath(folder)
+        self.extensions = tuple(extensions)
+        self.on_change = on_change
+        self.backend = backend
+        self.epoch = f"{os.getpid():x}{int(time.time() * 1000):x}"
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._entries = None
+        self._version = 0
+        self._log = deque(maxlen=history)
+        self._watcher = None
+
+    def _matches(self, name):
+        return name.lower().endswith(self.extensions)
+
+    def _scan(self):
+        entries = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if self._matches(entry.name):
+                        try:
+                            entries[entry.name] = entry.stat()
+                        except OSError as e:
+                            logger.debug("Failed to stat %s: %s", entry.name, e)
+        except (IOError, OSError) as e:
+            logger.debug("Failed to list %s: %s", self.folder, e)
+        return entries
+
+    def _stat(self, name):
+        try:
+            return os.stat(os.path.join(self.folder, name))
+        except OSError:
+            return None
+
+    def _record(self, name, stat):
+        previous = self._entries.get(name)
+        if stat is None:
+            if previous is None:
+                return False
+            del self._entries[name]
+            kind = "removed"
+        else:
+            self._entries[name] = stat
+            if previous is None:
+                kind = "added"
+            elif (previous.st_size, previous.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                kind = "modified"
+            else:
+                return False
+        self._version += 1
+        self._log.append((self._version, name, kind))
+        return True
+
+    def _cursor(self):
+        return f"{self.epoch}:{self._version}"
+
+    def start(self):
+        with self._start_lock:
+            if self._watcher is None:
+                os.makedirs(self.folder, exist_ok=True)
+                self._watcher = create_watcher([self.folder], self._on_paths, backend=self.backend).start()
+                logger.debug("Watching %s with the %s backend", self.folder, self._watcher.backend)
+            if self._entries is None:
+                entries = self._scan()
+                with self._lock:
+                    self._entries = entries
+        return self
+
+    def stop(self):
+        with self._start_lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher:
+            watcher.stop()
+
+    def _on_paths(self, paths):
+        names = {os.path.basename(path) for path in paths if os.path.dirname(os.path.abspath(path)) == self.folder}
+        if self.update(names) and self.on_change:
+            self.on_change(self)
+
+    def update(self, names):
+        stats = {name: self._stat(name) for name in names if self._matches(name)}
+        with self._lock:
+            if self._entries is None:
+                return False
+            changed = [self._record(name, stat) for name, stat in stats.items()]
+        return any(changed)
+
+    def entries(self):
+        self.start()
+        with self._lock:
+            return list(self._entries.items()), self._cursor()
+
+    def changes(self, cursor):
+        self.start()
+        epoch, _, version = (cursor or "").partition(":")
+        try:
+            version = int(version)
+        except ValueError:
+            version = -1
+
+        with self._lock:
+            result = {"cursor": self._cursor(), "total": len(self._entries), "reset": False,
+                      "added": [], "removed": [], "modified": []}
+            oldest = self._log[0][0] if self._log else self._version + 1
+            if epoch != self.epoch or not 0 <= version <= self._version or version + 1 < oldest:
+                result["reset"] = True
+                return result
+
+            net = {}
+            for change_version, name, kind in self._log:
+                if change_version > version:
+                    net[name] = (net.get(name, (kind,))[0], kind)
+            for name, (first, last) in net.items():
+                if first == "added":
+                    if last != "removed":
+                        result["added"].append((name, self._entries[name]))
+                elif last == "removed":
+                    result["removed"].append(name)
+                else:
+                    result["modified"].append((name, self._entries[name]))
+        return result
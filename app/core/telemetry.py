@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+JVM_OVERHEAD_MB = 384
+RAM_STEP_MB = 512
+
+
+def _round_up(value, step=RAM_STEP_MB):
+    return int(-(-value // step) * step)
+
+
+def recommend_max_ram(max_ram, peak_rss_mb, total_ram_mb=None, heap_after_gc_mb=None):
+    if heap_after_gc_mb:
+        heap_used = heap_after_gc_mb
+        source = "gc"
+    elif peak_rss_mb:
+        heap_used = max(peak_rss_mb - JVM_OVERHEAD_MB, 0)
+        source = "rss"
+    else:
+        return {"verdict": "unknown", "recommended_ram_mb": max_ram, "reason": "No samples were recorded"}
+
+    ceiling = _round_up(total_ram_mb * 0.75) if total_ram_mb else None
+    verdict, recommended = "ok", max_ram
+    reason = f"Peak heap use of about {heap_used:.0f} MB fits the {max_ram} MB limit"
+    high_water = 0.7 if source == "gc" else 0.9
+
+    if heap_used >= max_ram * high_water:
+        verdict = "too_low"
+        recommended = _round_up(max(heap_used * 1.5, max_ram + RAM_STEP_MB))
+        reason = f"Heap use of about {heap_used:.0f} MB is at or near the {max_ram} MB limit"
+    elif heap_used < max_ram * 0.4 and max_ram > 1024:
+        verdict = "too_high"
+        recommended = max(1024, _round_up(heap_used * 1.5))
+        reason = f"Heap use peaked at about {heap_used:.0f} MB of the {max_ram} MB limit"
+
+    if ceiling and recommended > ceiling:
+        recommended = max(min(max_ram, ceiling), 1024)
+        if verdict == "too_low":
+            reason += ", but system memory leaves no headroom to raise it"
+    return {"verdict": verdict, "recommended_ram_mb": recommended, "reason": reason, "source": source}
+
+
+class ProcessSampler:
+    FIELDS = ("t", "rss_mb", "cpu", "threads", "handles", "read_kbs", "write_kbs")
+
+    def __init__(self, pid, interval=2.0, capacity=1800):
+        self.pid = pid
+        self.interval = max(float(interval), 0.25)
+        self._samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = time.time()
+        self.peak_rss_mb = 0.0
+        self.peak_threads = 0
+        self._cpu_total = 0.0
+        self._count = 0
+
+    @property
+    def available(self):
+        return psutil is not None
+
+    def start(self):
+        if psutil is None:
+            logger.debug("psutil not available, process telemetry disabled")
+            return self
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            proc = psutil.Process(self.pid)
+            proc.cpu_percent(None)
+        except psutil.Error as e:
+            logger.debug("Cannot sample game process: %s", e)
+            return
+
+        cpus = psutil.cpu_count() or 1
+        origin = time.monotonic()
+        last_io, last_at = None, origin
+        while not self._stop.wait(self.interval):
+            try:
+                with proc.oneshot():
+                    rss_mb = proc.memory_info().rss / (1024 * 1024)
+                    cpu = proc.cpu_percent(None) / cpus
+                    threads = proc.num_threads()
+                    handles = proc.num_handles() if os.name == "nt" else proc.num_fds()
+                    try:
+                        io = proc.io_counters()
+                    except (psutil.AccessDenied, AttributeError):
+                        io = None
+            except psutil.Error:
+                return
+
+            now = time.monotonic()
+            read_kbs = write_kbs = 0.0
+            if io and last_io:
+                elapsed = max(now - last_at, 1e-6)
+                read_kbs = (io.read_bytes - last_io.read_bytes) / 1024 / elapsed
+                write_kbs = (io.write_bytes - last_io.write_bytes) / 1024 / elapsed
+            last_io, last_at = io, now
+
+            sample = (round(now - origin, 1), round(rss_mb, 1), round(cpu, 1), threads, handles,
+                      round(read_kbs, 1), round(write_kbs, 1))
+            with self._lock:
+                self._samples.append(sample)
+                self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+                self.peak_threads = max(self.peak_threads, threads)
+                self._cpu_total += cpu
+                self._count += 1
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def summary(self):
+        with self._lock:
+            return {"samples": self._count, "peak_rss_mb": round(self.peak_rss_mb, 1),
+                    "avg_cpu": round(self._cpu_total / self._count, 1) if self._count else 0.0,
+                    "peak_threads": self.peak_threads}
+
+    def to_dict(self):
+        return {"pid": self.pid, "started_at": self.started_at, "interval": self.interval,
+                "fields": list(self.FIELDS), "samples": self.samples(), "summary": self.summary()}
+
+    def save(self, path, **extra):
+        data = self.to_dict()
+        data.update(extra)
+        try:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+            return path
+        except (IOError, OSError) as e:
+            logger.debug("Could not save process metrics: %s", e)
+            return None
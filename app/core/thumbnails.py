@@ -0,0 +1,143 @@
+import os
+import io
+import time
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailCache:
+    FORMATS = {"PNG": (".png", "image/png"), "JPEG": (".jpg", "image/jpeg")}
+
+    def __init__(self, cache_dir, size=(150, 150), fmt="PNG"):
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.fmt = fmt
+        self.suffix, self.mime = self.FORMATS[fmt]
+
+    def key(self, filename, stat):
+        raw = f"{filename}\0{stat.st_size}\0{stat.st_mtime_ns}\0{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, filename, stat):
+        return os.path.join(self.cache_dir, self.key(filename, stat) + self.suffix)
+
+    def lookup(self, filename, stat):
+        path = self.path_for(filename, stat)
+        return path if os.path.exists(path) else None
+
+    def render(self, source):
+        if callable(source):
+            source = source()
+        with Image.open(source) as img:
+            img.thumbnail(self.size)
+            if self.fmt == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, format=self.fmt)
+            return buffer.getvalue()
+
+    def store(self, filename, stat, data):
+        path = self.path_for(filename, stat)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except (IOError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def get(self, filename, stat, source):
+        path = self.lookup(filename, stat)
+        if path:
+            return path
+        if Image is None:
+            return None
+        try:
+            return self.store(filename, stat, self.render(source))
+        except (IOError, OSError, ValueError) as e:
+            logger.debug("Failed to build thumbnail for %s: %s", filename, e)
+            return None
+
+    def prune(self, entries):
+        valid = {self.key(filename, stat) + self.suffix for filename, stat in entries}
+        removed = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for name in names:
+            # Temp files belong to a store() that is still writing
+            if name not in valid and not name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+class ThumbnailPool:
+    def __init__(self, max_workers=None, batch_interval=0.1, batch_size=16):
+        self.max_workers = max_workers or max(1, min(8, os.cpu_count() or 1))
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = set()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="thumbnail")
+            return self._executor
+
+    def submit(self, jobs, on_ready):
+        executor = self._get_executor()
+        futures = {}
+        with self._lock:
+            for key, build in jobs:
+                if key in self._pending:
+                    continue
+                self._pending.add(key)
+                futures[executor.submit(build)] = key
+        if futures:
+            threading.Thread(target=self._collect, args=(futures, on_ready), daemon=True).start()
+        return len(futures)
+
+    def _collect(self, futures, on_ready):
+        ready = {}
+        flushed_at = time.monotonic()
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                ready[key] = future.result()
+            except Exception as e:
+                logger.debug("Thumbnail job %s failed: %s", key, e)
+                ready[key] = None
+            with self._lock:
+                self._pending.discard(key)
+            if len(ready) >= self.batch_size or time.monotonic() - flushed_at >= self.batch_interval:
+                on_ready(ready)
+                ready = {}
+                flushed_at = time.monotonic()
+        if ready:
+            on_ready(ready)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
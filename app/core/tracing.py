@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class LaunchTrace:
+    def __init__(self, name="launch"):
+        self.name = name
+        self.started_at = time.time()
+        self.origin = time.monotonic()
+        self.spans = []
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end, category="launch", tid=None):
+        with self._lock:
+            self.spans.append((name, category, start, end, tid or threading.get_ident()))
+
+    @contextmanager
+    def span(self, name, category="launch"):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.monotonic(), category)
+
+    def mark(self, name, category="launch"):
+        with self._lock:
+            self.marks.append((name, category, time.monotonic(), threading.get_ident()))
+
+    def _ms(self, timestamp):
+        return round((timestamp - self.origin) * 1000, 3)
+
+    def summary(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s[2])
+            marks = list(self.marks)
+        end = max([s[3] for s in spans] + [m[2] for m in marks] + [self.origin])
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "total_ms": self._ms(end),
+            "spans": [{"name": name, "category": category, "start_ms": self._ms(start),
+                       "duration_ms": round((stop - start) * 1000, 3)}
+                      for name, category, start, stop, _ in spans],
+            "marks": [{"name": name, "category": category, "at_ms": self._ms(at)} for name, category, at, _ in marks],
+        }
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            marks = list(self.marks)
+        events = [{"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                   "ts": round((start - self.origin) * 1e6), "dur": round((end - start) * 1e6)}
+                  for name, category, start, end, tid in spans]
+        events += [{"name": name, "cat": category, "ph": "i", "s": "g", "pid": pid, "tid": tid,
+                    "ts": round((at - self.origin) * 1e6)}
+                   for name, category, at, tid in marks]
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"name": self.name, "started_at": self.started_at}}
+
+    def save(self, traces_dir, keep=20):
+        try:
+            os.makedirs(traces_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+            path = os.path.join(traces_dir, f"{self.name}-{stamp}.json")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.to_chrome_trace(), f)
+            os.replace(tmp_path, path)
+            self._prune(traces_dir, keep)
+            return path
+        except (IOError, OSError) as e:
+            logger.debug("Could not save launch trace: %s", e)
+            return None
+
+    def _prune(self, traces_dir, keep):
+        traces = sorted(f for f in os.listdir(traces_dir) if f.endswith(".json"))
+        for name in traces[:-keep]:
+            try:
+                os.remove(os.path.join(traces_dir, name))
+            except OSError:
+                pass
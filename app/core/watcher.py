@@ -0,0 +1,291 @@
+import os
+import sys
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Debouncer:
+    def __init__(self, callback, delay):
+        self.callback = callback
+        self.delay = delay
+        self._paths = set()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, path):
+        with self._lock:
+            self._paths.add(path)
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            paths, self._paths = self._paths, set()
+            self._timer = None
+        if not paths:
+            return
+        try:
+            self.callback(sorted(paths))
+        except Exception as e:
+            logger.error("Watcher callback failed: %s", e)
+
+    def cancel(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = None
+            self._paths = set()
+
+
+class DirectoryWatcher:
+    backend = "base"
+
+    def __init__(self, paths, on_change, debounce=0.3):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self._debouncer = _Debouncer(on_change, debounce)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._debouncer.cancel()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _emit(self, path):
+        if not self._stop.is_set():
+            self._debouncer.add(path)
+
+    def _emit_all(self, directory):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    self._emit(entry.path)
+        except OSError:
+            pass
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class PollingWatcher(DirectoryWatcher):
+    backend = "poll"
+
+    def __init__(self, paths, on_change, debounce=0.3, min_interval=0.5, max_interval=5.0):
+        super().__init__(paths, on_change, debounce)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+    def _snapshot(self, directory):
+        state = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        stat = entry.stat()
+                        state[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return state
+
+    def _run(self):
+        states = {path: self._snapshot(path) for path in self.paths}
+        interval = self.min_interval
+        while not self._stop.wait(interval):
+            changed = False
+            for path in self.paths:
+                current = self._snapshot(path)
+                previous = states[path]
+                for entry_path in current.keys() | previous.keys():
+                    if current.get(entry_path) != previous.get(entry_path):
+                        self._emit(entry_path)
+                        changed = True
+                states[path] = current
+            interval = self.min_interval if changed else min(interval * 2, self.max_interval)
+
+
+class InotifyWatcher(DirectoryWatcher):
+    backend = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, paths, on_change, debounce=0.3):
+        super().__init__(paths, on_change, debounce)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        for path in self.paths:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+            self._watches[wd] = path
+
+    def stop(self):
+        # AntiCheat can stop the watcher twice; a second close could hit a reused descriptor
+        fd, self._fd = self._fd, -1
+        if fd < 0:
+            return
+        super().stop()
+        self.join(1.0)
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def _run(self):
+        fd = self._fd
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([fd], [], [], 0.5)
+                if not readable:
+                    continue
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except (OSError, ValueError):
+                return
+            self._parse(data)
+
+    def _parse(self, data):
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                for directory in self.paths:
+                    self._emit_all(directory)
+                continue
+            directory = self._watches.get(wd)
+            if directory and name:
+                self._emit(os.path.join(directory, os.fsdecode(name)))
+
+
+class WindowsWatcher(DirectoryWatcher):
+    backend = "windows"
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_ALL = 0x00000007
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    NOTIFY_FILTER = 0x00000001 | 0x00000002 | 0x00000008 | 0x00000010
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, paths, on_change, debounce=0.3):
+        super().__init__(paths, on_change, debounce)
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                         wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+        kernel32.ReadDirectoryChangesW.restype = wintypes.BOOL
+        kernel32.ReadDirectoryChangesW.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD, wintypes.BOOL,
+                                                   wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                                   wintypes.LPVOID, wintypes.LPVOID]
+        kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self._kernel32 = kernel32
+        self._wintypes = wintypes
+
+        self._handles = {}
+        for path in self.paths:
+            handle = kernel32.CreateFileW(path, self.FILE_LIST_DIRECTORY, self.FILE_SHARE_ALL, None,
+                                          self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS, None)
+            if not handle or handle == ctypes.c_void_p(-1).value:
+                self._close_handles()
+                raise OSError(ctypes.get_last_error(), f"CreateFileW failed for {path}")
+            self._handles[path] = handle
+
+    def start(self):
+        for path, handle in self._handles.items():
+            thread = threading.Thread(target=self._watch, args=(path, handle), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        super().stop()
+        for handle in self._handles.values():
+            self._kernel32.CancelIoEx(handle, None)
+        self.join(1.0)
+        self._close_handles()
+
+    def _close_handles(self):
+        for handle in self._handles.values():
+            self._kernel32.CloseHandle(handle)
+        self._handles = {}
+
+    def _watch(self, directory, handle):
+        buffer = ctypes.create_string_buffer(self.BUFFER_SIZE)
+        returned = self._wintypes.DWORD()
+        while not self._stop.is_set():
+            ok = self._kernel32.ReadDirectoryChangesW(handle, buffer, self.BUFFER_SIZE, False, self.NOTIFY_FILTER,
+                                                      ctypes.byref(returned), None, None)
+            if not ok:
+                return
+            if returned.value == 0:
+                self._emit_all(directory)
+                continue
+            self._parse(directory, buffer.raw[:returned.value])
+
+    def _parse(self, directory, data):
+        offset = 0
+        while True:
+            next_offset, _, length = struct.unpack_from("III", data, offset)
+            name = data[offset + 12:offset + 12 + length].decode("utf-16-le")
+            self._emit(os.path.join(directory, name))
+            if not next_offset:
+                return
+            offset += next_offset
+
+
+def create_watcher(paths, on_change, debounce=0.3, backend=None):
+    paths = [p for p in paths if os.path.isdir(p)]
+    if backend != "poll":
+        native = None
+        if sys.platform.startswith("linux"):
+            native = InotifyWatcher
+        elif os.name == "nt":
+            native = WindowsWatcher
+        if native:
+            try:
+                return native(paths, on_change, debounce)
+            except (OSError, AttributeError) as e:
+                logger.debug("Native file watcher unavailable, falling back to polling: %s", e)
+    return PollingWatcher(paths, on_change, debounce)
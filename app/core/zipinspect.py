@@ -0,0 +1,174 @@
+import io
+import os
+import bisect
+import re
+import struct
+import zlib
+import zipfile
+
+
+def compile_keywords(keywords):
+    return re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+
+
+class ZipInspector:
+    MAX_MEMBER_SIZE = 64 * 1024 * 1024
+    EOCD = struct.Struct("<4s4H2LH")
+    CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+    # signature, flags, name/extra/comment lengths out of the same 46-byte header
+    CENTRAL_LENGTHS = struct.Struct("<4s4xH18x3H")
+    LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+    EOCD_SIGNATURE = b"PK\x05\x06"
+    CENTRAL_SIGNATURE = b"PK\x01\x02"
+    LOCAL_SIGNATURE = b"PK\x03\x04"
+    FLAG_ENCRYPTED = 0x1
+    FLAG_UTF8 = 0x800
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "rb")
+        self._zf = None
+        self._cd = None
+        self._entries = None
+        self._lowered = None
+        try:
+            self._read_central_directory()
+        except zipfile.BadZipFile:
+            self._f.close()
+            raise
+        if self._entries is None:
+            try:
+                self._zf = zipfile.ZipFile(self._f)
+            except zipfile.BadZipFile:
+                self._f.close()
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._zf:
+            self._zf.close()
+        self._f.close()
+
+    def _read_central_directory(self):
+        self._f.seek(0, os.SEEK_END)
+        file_size = self._f.tell()
+        tail_size = min(file_size, self.EOCD.size + 0xFFFF)
+        self._f.seek(file_size - tail_size)
+        tail = self._f.read(tail_size)
+
+        eocd_pos = tail.rfind(self.EOCD_SIGNATURE)
+        if eocd_pos < 0 or eocd_pos + self.EOCD.size > len(tail):
+            raise zipfile.BadZipFile(f"Not a zip file: {self.path}")
+        _, disk, cd_disk, _, count, cd_size, cd_offset, _ = self.EOCD.unpack_from(tail, eocd_pos)
+        if disk or cd_disk or count == 0xFFFF or cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            return
+
+        self._f.seek(cd_offset)
+        cd = self._f.read(cd_size)
+        if len(cd) != cd_size:
+            return
+
+        # Walk the headers by their declared lengths; signature bytes inside a header prove nothing.
+        # Anything this walk cannot follow is left to zipfile, which raises BadZipFile if it is really broken.
+        entries = {}
+        pos = 0
+        cd_len = len(cd)
+        header_size = self.CENTRAL_HEADER.size
+        unpack = self.CENTRAL_LENGTHS.unpack_from
+        for _ in range(count):
+            if pos + header_size > cd_len:
+                return
+            signature, flags, name_len, extra_len, comment_len = unpack(cd, pos)
+            name_end = pos + header_size + name_len
+            if signature != self.CENTRAL_SIGNATURE or name_end > cd_len:
+                return
+            raw = cd[pos + header_size:name_end]
+            name = raw.decode("ascii") if raw.isascii() else raw.decode(
+                "utf-8" if flags & self.FLAG_UTF8 else "cp437", errors="replace")
+            entries[name] = pos
+            pos = name_end + extra_len + comment_len
+        self._cd = cd
+        self._entries = entries
+
+    def _header(self, name):
+        return self.CENTRAL_HEADER.unpack_from(self._cd, self._entries[name])
+
+    def _names(self):
+        return self._zf.NameToInfo if self._zf else self._entries
+
+    def _lowered_names(self):
+        if self._lowered is None:
+            names = list(self._names())
+            lowered = [name.lower() for name in names]
+            starts, offset = [], 0
+            for name in lowered:
+                starts.append(offset)
+                offset += len(name) + 1
+            self._lowered = (names, starts, "\n".join(lowered))
+        return self._lowered
+
+    def __len__(self):
+        return len(self._names())
+
+    def __contains__(self, name):
+        return name in self._names()
+
+    def find_keyword(self, pattern):
+        names, starts, blob = self._lowered_names()
+        match = pattern.search(blob)
+        if not match:
+            return None
+        return names[bisect.bisect_right(starts, match.start()) - 1]
+
+    def find_suffix(self, suffix):
+        return [name for name in self._names() if name.endswith(suffix)]
+
+    def size(self, name):
+        if self._zf:
+            return self._zf.getinfo(name).file_size
+        return self._header(name)[9]
+
+    def open(self, name):
+        if self._zf:
+            info = self._zf.getinfo(name)
+            if info.file_size > self.MAX_MEMBER_SIZE:
+                raise ValueError(f"Archive member too large: {name}")
+            return self._zf.open(info)
+
+        header = self._header(name)
+        flags, method, compressed_size, file_size, offset = header[3], header[4], header[8], header[9], header[16]
+        if file_size > self.MAX_MEMBER_SIZE:
+            raise ValueError(f"Archive member too large: {name}")
+        if flags & self.FLAG_ENCRYPTED:
+            raise ValueError(f"Encrypted archive member: {name}")
+
+        self._f.seek(offset)
+        try:
+            local = self.LOCAL_HEADER.unpack(self._f.read(self.LOCAL_HEADER.size))
+        except struct.error:
+            raise zipfile.BadZipFile(f"Truncated local header for {name}")
+        if local[0] != self.LOCAL_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad local header for {name}")
+        self._f.seek(local[9] + local[10], os.SEEK_CUR)
+        data = self._f.read(compressed_size)
+
+        if method == zipfile.ZIP_STORED:
+            return io.BytesIO(data)
+        if method == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-15)
+            content = decompressor.decompress(data, self.MAX_MEMBER_SIZE + 1)
+            if len(content) > self.MAX_MEMBER_SIZE:
+                raise ValueError(f"Archive member too large: {name}")
+            return io.BytesIO(content)
+
+        with zipfile.ZipFile(self.path) as zf:
+            return io.BytesIO(zf.read(name))
+
+    def read(self, name):
+        with self.open(name) as f:
+            return f.read()
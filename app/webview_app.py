@@ -8,9 +8,7 @@ import urllib.request
 import urllib.parse
 import subprocess
 import json
-import base64
 import zipfile
-import io
 import logging
 from pathlib import Path
 
@@ -22,6 +20,12 @@ from app.core.service import LauncherService
 from app.core.settings import SettingsManager
 from app.core.resources import ResourceManager
 from app.core.auth import MicrosoftAuth
+from app.core.logrelay import LogRelay
+from app.core import sessionlog
+from app.core import gclog
+from app.core.benchmark import BenchmarkRunner, PRESETS, latest_report
+from app.core.thumbnails import ThumbnailCache, ThumbnailPool
+from app.core.snapshots import FolderSnapshot
 
 try:
     from app.template_renderer import TemplateRenderer
@@ -105,6 +109,14 @@ class JSApi:
         self.launcher = launcher_service
         self.settings = settings_mgr
         self.auth = None
+        self.log_relay = None
+        self.benchmark = None
+        thumbs_dir = os.path.join(launcher_service.data_dir, "thumbs")
+        self.screenshot_thumbs = ThumbnailCache(os.path.join(thumbs_dir, "screenshots"), (150, 150), "JPEG")
+        self.pack_thumbs = ThumbnailCache(os.path.join(thumbs_dir, "texturepacks"), (64, 64), "PNG")
+        self.thumbnail_pool = ThumbnailPool()
+        self.gallery_snapshots = {}
+        self._snapshot_lock = threading.Lock()
 
     def set_window(self, window):
         self._window = window
@@ -139,18 +151,107 @@ class JSApi:
             hash_bytes[8] = (hash_bytes[8] & 0x3f) | 0x80
             config["uuid"] = str(uuid.UUID(bytes=bytes(hash_bytes)))
 
+        if self.log_relay:
+            self.log_relay.close()
+        log_relay = LogRelay(self._emit_logs)
+        self.log_relay = log_relay
+
         def on_log(msg):
-            if self._window:
-                safe_msg = msg.replace("'", "\\'").replace('"', '\\"')
-                self._window.evaluate_js(f"console.log('Game: {safe_msg}')")
+            log_relay.push(msg)
 
         def on_exit(code):
+            log_relay.close()
             if self._window:
                 self._window.evaluate_js("resetLaunchButton()")
 
-        self.launcher.launch(config, on_log=on_log, on_exit=on_exit)
+        self.launcher.launch(config, on_log=on_log, on_exit=on_exit, on_output=log_relay.push_many)
         return {"status": "success"}
 
+    def _emit_logs(self, lines):
+        if self._window:
+            self._window.evaluate_js(f"if(window.onGameLog) onGameLog({json.dumps(lines)})")
+
+    def get_log_tail(self, n=200):
+        lines = self.log_relay.tail(int(n)) if self.log_relay else []
+        return {"status": "success", "lines": lines}
+
+    def search_logs(self, query="", session=None, level=None, limit=200, whole_words=False):
+        try:
+            matches = sessionlog.search_logs(self.launcher.logs_dir, query, session, level, int(limit), bool(whole_words))
+            return {"status": "success", "matches": matches, "sessions": sessionlog.list_sessions(self.launcher.logs_dir)}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def get_process_metrics(self):
+        sampler = self.launcher.sampler
+        if not sampler:
+            return {"status": "error", "message": "No game session yet"}
+        if not sampler.available:
+            return {"status": "error", "message": "psutil not available"}
+        result = {"status": "success", "running": self.launcher.last_metrics is None}
+        result.update(sampler.to_dict())
+        if self.launcher.last_metrics:
+            result["recommendation"] = self.launcher.last_metrics["recommendation"]
+        return result
+
+    def get_gc_summary(self, session=None, limit=10):
+        try:
+            return {"status": "success", "sessions": gclog.summarize_sessions(self.launcher.logs_dir, session, int(limit))}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def start_benchmark(self, duration=60, stand_in=False, apply=True):
+        if self.launcher.process and self.launcher.process.poll() is None:
+            return {"status": "error", "message": "Close the game before running a benchmark"}
+        if self.benchmark and self.benchmark.running:
+            return {"status": "error", "message": "A benchmark is already running"}
+
+        def on_progress(message, index, total):
+            if self._window:
+                self._window.evaluate_js(f"if(window.onBenchmarkProgress) onBenchmarkProgress({json.dumps(message)}, {index}, {total})")
+
+        runner = BenchmarkRunner(self.launcher, duration, stand_in=stand_in, on_progress=on_progress)
+        self.benchmark = runner
+        config = dict(self.settings.settings)
+
+        def _run():
+            try:
+                report = runner.run(config)
+                if apply and report["best"]:
+                    self.settings.set("performance_mode", report["best"])
+                    self.settings.set("performance", dict(PRESETS[report["best"]]))
+                result = {"status": "success", "report": report}
+            except Exception as e:
+                logger.error("Benchmark failed: %s", e)
+                result = {"status": "error", "message": str(e)}
+            if self._window:
+                self._window.evaluate_js(f"if(window.onBenchmarkComplete) onBenchmarkComplete({json.dumps(result)})")
+
+        threading.Thread(target=_run, daemon=True).start()
+        return {"status": "success", "presets": runner.presets}
+
+    def get_benchmark_report(self):
+        report = latest_report(os.path.join(self.launcher.data_dir, "benchmarks"))
+        if not report:
+            return {"status": "error", "message": "No benchmark has been run yet"}
+        return {"status": "success", "report": report}
+
+    def get_java_runtimes(self, refresh=False):
+        try:
+            runtimes = self.launcher.runtimes.discover(refresh=bool(refresh))
+            selected = self.launcher.runtimes.select(*self.launcher.JAVA_VERSION_RANGE)
+            bundled = self.launcher.java_mgr.find_java_executable()
+            return {"status": "success", "runtimes": runtimes, "bundled": bundled,
+                    "selected": selected["java"] if selected else None}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def get_last_launch_trace(self):
+        trace = self.launcher.last_trace
+        if trace is None:
+            return {"status": "error", "message": "No launch recorded yet"}
+        return {"status": "success", "trace": trace.summary()}
+
     def get_settings(self):
         return self.settings.settings
 
@@ -198,77 +299,137 @@ class JSApi:
         logger.warning("Path validation failed for: %s", path)
         return {"status": "error", "message": "Path validation failed"}
     
-    def get_screenshots(self):
-        base_dir = self.launcher.root_dir
-        screenshots_dir = os.path.join(base_dir, "screenshots")
-        os.makedirs(screenshots_dir, exist_ok=True)
-        
-        items = []
-        try:
-            for filename in os.listdir(screenshots_dir):
-                if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    filepath = os.path.join(screenshots_dir, filename)
-                    try:
-                        from PIL import Image
-                        with Image.open(filepath) as img:
-                            img.thumbnail((150, 150))
-                            buffer = io.BytesIO()
-                            img.save(buffer, format='PNG')
-                            thumbnail = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                        
-                        stat = os.stat(filepath)
-                        items.append({
-                            "filename": filename,
-                            "thumbnail": f"data:image/png;base64,{thumbnail}",
-                            "size": stat.st_size,
-                            "modified": stat.st_mtime
-                        })
-                    except (IOError, OSError) as e:
-                        logger.debug("Failed to process screenshot %s: %s", filename, e)
-        except (IOError, OSError) as e:
-            logger.debug("Failed to list screenshots: %s", e)
-        
-        return {"status": "success", "items": sorted(items, key=lambda x: x["modified"], reverse=True)}
-    
-    def get_texturepacks(self):
-        base_dir = self.launcher.root_dir
-        packs_dir = os.path.join(base_dir, "texturepacks")
-        os.makedirs(packs_dir, exist_ok=True)
-        
-        items = []
-        try:
-            for filename in os.listdir(packs_dir):
-                if filename.lower().endswith('.zip'):
-                    filepath = os.path.join(packs_dir, filename)
-                    thumbnail = None
-                    pack_name = os.path.splitext(filename)[0]
-                    
-                    try:
-                        with zipfile.ZipFile(filepath, 'r') as zf:
-                            if 'pack.png' in zf.namelist():
-                                with zf.open('pack.png') as img_file:
-                                    from PIL import Image
-                                    img = Image.open(img_file)
-                                    img.thumbnail((64, 64))
-                                    buffer = io.BytesIO()
-                                    img.save(buffer, format='PNG')
-                                    thumbnail = f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode('utf-8')}"
-                    except (zipfile.BadZipFile, IOError, OSError) as e:
-                        logger.debug("Failed to read texturepack %s: %s", filename, e)
-                    
-                    stat = os.stat(filepath)
-                    items.append({
-                        "filename": filename,
-                        "name": pack_name,
-                        "thumbnail": thumbnail,
-                        "size": stat.st_size,
-                        "modified": stat.st_mtime
-                    })
-        except (IOError, OSError) as e:
-            logger.debug("Failed to list texturepacks: %s", e)
-        
-        return {"status": "success", "items": sorted(items, key=lambda x: x["name"].lower())}
-    
+    GALLERY_EXTENSIONS = {"screenshots": ('.png', '.jpg', '.jpeg'), "texturepacks": ('.zip',)}
+    SCREENSHOT_SORTS = {
+        "newest": (lambda e: e[1].st_mtime_ns, True),
+        "oldest": (lambda e: e[1].st_mtime_ns, False),
+        "name": (lambda e: e[0].lower(), False),
+        "size": (lambda e: e[1].st_size, True),
+    }
+
+    def _gallery_snapshot(self, folder_type):
+        with self._snapshot_lock:
+            snapshot = self.gallery_snapshots.get(folder_type)
+            if snapshot is None:
+                snapshot = FolderSnapshot(os.path.join(self.launcher.root_dir, folder_type),
+                                          self.GALLERY_EXTENSIONS[folder_type],
+                                          on_change=lambda _: self._emit_folder_changed(folder_type))
+                self.gallery_snapshots[folder_type] = snapshot
+        return snapshot.start()
+
+    def _emit_folder_changed(self, folder_type):
+        if self._window:
+            self._window.evaluate_js(f"if(window.onFolderChanged) onFolderChanged({json.dumps(folder_type)})")
+
+    def _shutdown(self):
+        self.thumbnail_pool.shutdown()
+        for snapshot in self.gallery_snapshots.values():
+            snapshot.stop()
+
+    def _gallery_thumbs(self, folder_type):
+        return self.screenshot_thumbs if folder_type == "screenshots" else self.pack_thumbs
+
+    def _cached_thumbnail_url(self, folder_type, filename, stat):
+        path = self._gallery_thumbs(folder_type).lookup(filename, stat)
+        return Path(path).as_uri() if path else None
+
+    def _build_thumbnail(self, folder_type, folder, filename, stat):
+        cache = self._gallery_thumbs(folder_type)
+        filepath = os.path.join(folder, filename)
+        if folder_type == "screenshots":
+            path = cache.get(filename, stat, filepath)
+        else:
+            path = cache.lookup(filename, stat)
+            entry = None if path else self.launcher.pack_index.get(filepath, stat)
+            if entry and entry["icon"]:
+                path = cache.get(filename, stat, lambda: self.launcher.pack_index.read_icon(filepath))
+        return Path(path).as_uri() if path else None
+
+    def _page(self, entries, offset, limit):
+        offset = max(int(offset), 0)
+        limit = max(int(limit), 0)
+        return entries[offset:offset + limit] if limit else entries[offset:]
+
+    def _gallery_item(self, folder_type, folder, filename, stat):
+        item = {
+            "filename": filename,
+            "thumbnail": self._cached_thumbnail_url(folder_type, filename, stat),
+            "size": stat.st_size,
+            "modified": stat.st_mtime
+        }
+        if folder_type == "texturepacks":
+            pack = self.launcher.pack_index.get(os.path.join(folder, filename), stat) or {}
+            item.update(name=os.path.splitext(filename)[0], description=pack.get("description"),
+                        entries=pack.get("entries", 0), valid=pack.get("valid", True))
+        return item
+
+    def get_screenshots(self, offset=0, limit=0, sort="newest"):
+        snapshot = self._gallery_snapshot("screenshots")
+        entries, cursor = snapshot.entries()
+        key, reverse = self.SCREENSHOT_SORTS.get(sort, self.SCREENSHOT_SORTS["newest"])
+        entries.sort(key=key, reverse=reverse)
+        if not offset:
+            self.screenshot_thumbs.prune(entries)
+
+        items = [self._gallery_item("screenshots", snapshot.folder, filename, stat)
+                 for filename, stat in self._page(entries, offset, limit)]
+        return {"status": "success", "items": items, "total": len(entries), "cursor": cursor}
+
+    def get_texturepacks(self, offset=0, limit=0):
+        snapshot = self._gallery_snapshot("texturepacks")
+        entries, cursor = snapshot.entries()
+        entries.sort(key=lambda e: os.path.splitext(e[0])[0].lower())
+        if not offset:
+            self.pack_thumbs.prune(entries)
+            self.launcher.pack_index.prune()
+
+        items = [self._gallery_item("texturepacks", snapshot.folder, filename, stat)
+                 for filename, stat in self._page(entries, offset, limit)]
+        self.launcher.pack_index.flush()
+        return {"status": "success", "items": items, "total": len(entries), "cursor": cursor}
+
+    def get_folder_changes(self, folder_type, cursor=None):
+        if folder_type not in self.GALLERY_EXTENSIONS:
+            return {"status": "error", "message": "Invalid folder type"}
+
+        snapshot = self._gallery_snapshot(folder_type)
+        changes = snapshot.changes(cursor)
+        for kind in ("added", "modified"):
+            changes[kind] = [self._gallery_item(folder_type, snapshot.folder, filename, stat)
+                             for filename, stat in changes[kind]]
+        if folder_type == "texturepacks":
+            self.launcher.pack_index.flush()
+        return dict(changes, status="success")
+
+    def _thumbnail_job(self, folder_type, folder, filename):
+        def build():
+            try:
+                stat = os.stat(os.path.join(folder, filename))
+                return self._build_thumbnail(folder_type, folder, filename, stat)
+            except (zipfile.BadZipFile, ValueError, IOError, OSError) as e:
+                logger.debug("Failed to build thumbnail for %s: %s", filename, e)
+                return None
+        return build
+
+    def request_thumbnails(self, folder_type, filenames):
+        if folder_type not in self.GALLERY_EXTENSIONS:
+            return {"status": "error", "message": "Invalid folder type"}
+
+        folder = os.path.join(self.launcher.root_dir, folder_type)
+        jobs = [((folder_type, filename), self._thumbnail_job(folder_type, folder, filename))
+                for filename in filenames if not ('..' in filename or '/' in filename or '\\' in filename)]
+        queued = self.thumbnail_pool.submit(jobs, self._emit_thumbnails)
+        return {"status": "success", "queued": queued}
+
+    def _emit_thumbnails(self, ready):
+        if not self._window:
+            return
+        by_folder = {}
+        for (folder_type, filename), url in ready.items():
+            by_folder.setdefault(folder_type, {})[filename] = url
+        for folder_type, thumbnails in by_folder.items():
+            self._window.evaluate_js(f"if(window.onThumbnailsReady) onThumbnailsReady({json.dumps(folder_type)}, {json.dumps(thumbnails)})")
+
     def delete_file(self, folder_type, filename):
         if folder_type not in {"screenshots", "texturepacks"}:
             return {"status": "error", "message": "Invalid folder type"}
@@ -287,6 +448,7 @@ class JSApi:
         try:
             if os.path.exists(filepath):
                 os.remove(filepath)
+                self._gallery_snapshot(folder_type).update([filename])
                 return {"status": "success"}
             return {"status": "error", "message": "File not found"}
         except (IOError, OSError) as e:
@@ -514,12 +676,25 @@ def main():
         background_color='#1f2022'
     )
     api.set_window(window)
+    window.events.closed += api._shutdown
+
+    def on_extract_progress(key, bytes_done, bytes_total, files_done, files_total):
+        done_mb = bytes_done / (1024 * 1024)
+        size_text = f"{done_mb:.0f}/{bytes_total / (1024 * 1024):.0f} MB" if bytes_total else f"{done_mb:.0f} MB"
+        files_text = f"{files_done}/{files_total}" if files_total else str(files_done)
+        status = json.dumps(f"Extracting {key}... {size_text}, {files_text} files")
+        window.evaluate_js(f"if(window.updateStatus) updateStatus({status});")
 
     def init_sequence():
         time.sleep(0.5)
         try:
             window.evaluate_js("if(window.updateStatus) updateStatus('Extracting assets...');")
-            ResourceManager(root_dir).extract_assets()
+            resources = ResourceManager(root_dir)
+            java_config = {"java_path": settings_mgr.get("java_path"), "java_runtime": settings_mgr.get("java_runtime")}
+            skip = () if launcher_service.needs_bundled_java(java_config) else ("java",)
+            resources.extract_assets(on_progress=on_extract_progress, skip=skip)
+            if settings_mgr.get("deep_verify_assets"):
+                resources.start_deep_verify()
             window.evaluate_js("if(window.updateStatus) updateStatus('Ready!');")
             time.sleep(0.5)
             window.load_url(f'file:///{main_html}')
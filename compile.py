@@ -107,8 +107,71 @@ def render_templates():
         print(f"[!] WARNING: Failed to render templates: {e}")
         print("    Build will proceed with existing index.html")
 
+BUNDLE_PARTS = max(2, min(8, os.cpu_count() or 4))
+
+
+def build_asset_bundle(archive_path, parts=BUNDLE_PARTS):
+    """Split a .tar.xz into independent xz parts so it can be decompressed on several cores."""
+    import json
+    import tarfile
+
+    bundle_dir = archive_path[:-len(".tar.xz")] + ".bundle"
+    index_path = os.path.join(bundle_dir, "index.json")
+    if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(archive_path):
+        print(f"[OK] Asset bundle up to date: {bundle_dir}")
+        return bundle_dir
+
+    print(f"[*] Building {parts}-part asset bundle from {archive_path}...")
+    if os.path.exists(bundle_dir):
+        shutil.rmtree(bundle_dir)
+    os.makedirs(bundle_dir)
+
+    names = [f"part-{i:03d}.tar.xz" for i in range(parts)]
+    writers = [tarfile.open(os.path.join(bundle_dir, name), "w:xz", preset=6) for name in names]
+    part_bytes = [0] * parts
+    part_files = [0] * parts
+    try:
+        with tarfile.open(archive_path, "r|xz") as src:
+            for member in src:
+                if member.isdir():
+                    writers[0].addfile(member)
+                    continue
+                target = part_bytes.index(min(part_bytes))
+                fileobj = src.extractfile(member) if member.isfile() else None
+                writers[target].addfile(member, fileobj)
+                part_bytes[target] += member.size
+                part_files[target] += 1 if member.isfile() else 0
+    finally:
+        for writer in writers:
+            writer.close()
+
+    index = {
+        "format": 1,
+        "bytes": sum(part_bytes),
+        "files": sum(part_files),
+        "parts": [{"file": name, "bytes": b, "files": n} for name, b, n in zip(names, part_bytes, part_files)],
+    }
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    print(f"[OK] Asset bundle written: {bundle_dir} ({index['files']} files)")
+    return bundle_dir
+
+
+def build_asset_bundles():
+    """Build chunked bundles for every bundled .tar.xz under assets/."""
+    bundled = set()
+    if not os.path.exists("assets"):
+        return bundled
+    for name in os.listdir("assets"):
+        if name.endswith(".tar.xz"):
+            build_asset_bundle(os.path.join("assets", name))
+            bundled.add(name)
+    return bundled
+
+
 embed_client_id()
 render_templates()
+BUNDLED_ARCHIVES = build_asset_bundles()
 
 SCRIPT_PATH = "app/webview_app.py"
 
@@ -117,13 +180,15 @@ APP_VERSION = "2.0.0"
 APP_DESCRIPTION = "MeoLauncher - Minecraft BTA Modpack Launcher"
 
 
-def include_files(source_folder, target_folder):
+def include_files(source_folder, target_folder, exclude=()):
     """Recursively include all files from a folder."""
     files = []
     if not os.path.exists(source_folder):
         return files
     for root, _, filenames in os.walk(source_folder):
         for filename in filenames:
+            if filename in exclude:
+                continue
             source_path = os.path.join(root, filename)
             relative_path = os.path.relpath(source_path, source_folder)
             target_path = os.path.join(target_folder, relative_path)
@@ -146,7 +211,7 @@ if os.path.exists("app/java_pkg"):
     additional_files += include_files("app/java_pkg", "app/java_pkg/")
 
 if os.path.exists("assets"):
-    additional_files += include_files("assets", "assets/")
+    additional_files += include_files("assets", "assets/", exclude=BUNDLED_ARCHIVES)
 
 if os.path.exists("data"):
     additional_files += include_files("data", "data/")
@@ -185,6 +250,7 @@ build_options = {
         "certifi",
         "cryptography",  
         "psutil",
+        "numpy",
     ],
     "excludes": [
         "tkinter",